@@ -0,0 +1,154 @@
+"""
+End-to-end benchmarks of the OC-DECLARE plugin methods on synthetic logs.
+
+Usage::
+
+    uv run python benchmarks/run.py --events 10000 100000 --output bench.json
+
+Every plugin method is timed on a cold cache (the log has to be exported and imported) and on a
+warm cache (the imported log is reused). Results, including the per-stage metrics recorded by the
+plugin, are written as JSON so they can be compared across releases.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from importlib.metadata import version
+from pathlib import Path
+
+from synthetic import Pattern, SyntheticConfig, generate_ocel
+
+from oc_declare_plug.cache import processed_ocel_cache
+from oc_declare_plug.plugin import (
+    CheckInput,
+    ConstraintInput,
+    Constraints,
+    CreateConstraintsInput,
+    DiscoverInput,
+    OcDeclare,
+)
+
+
+def _constraint_inputs(patterns: list[Pattern], object_type: str) -> list[ConstraintInput]:
+    return [
+        ConstraintInput(
+            type=p.type,
+            source=p.source,
+            target=p.target,
+            any_objects=[object_type],
+            all_objects=[],
+            each_objects=[],
+            min=[1],
+            max=[],
+        )
+        for p in patterns
+    ]
+
+
+def _measure(method: Callable[[], Constraints]) -> tuple[float, Constraints]:
+    start = time.perf_counter()
+    result = method()
+    return time.perf_counter() - start, result
+
+
+def run_config(config: SyntheticConfig, threshold: float, repeat: int) -> dict:
+    start = time.perf_counter()
+    ocel = generate_ocel(config)
+    generation_time = time.perf_counter() - start
+
+    plugin = OcDeclare()
+    patterns = config.patterns or config.default_patterns()
+    discover_input = DiscoverInput(threshold=threshold, acts_to_use=config.activity_names, check_conformance=True)
+    create_input = CreateConstraintsInput(
+        constraints=_constraint_inputs(patterns, config.object_type_names[0]), check_conformance=True
+    )
+
+    def discover() -> Constraints:
+        return plugin.discover_constraints(ocel, discover_input)
+
+    def create() -> Constraints:
+        return plugin.create_constraints(ocel, create_input)
+
+    def check() -> Constraints:
+        return plugin.check_constraints(ocel, discovered.model_copy(deep=True), CheckInput())
+
+    discovered = discover()
+    runs = []
+    for name, method in [
+        ("discover_constraints", discover),
+        ("create_constraints", create),
+        ("check_constraints", check),
+    ]:
+        processed_ocel_cache.clear()
+        for iteration in range(repeat + 1):
+            wall_time, result = _measure(method)
+            runs.append(
+                {
+                    "method": name,
+                    "cache": "cold" if iteration == 0 else "warm",
+                    "wall_time": round(wall_time, 6),
+                    "constraints": len(result.constraints),
+                    "stages": [m.model_dump() for m in result.metrics or []],
+                }
+            )
+
+    return {
+        "config": {**asdict(config), "patterns": [asdict(p) for p in patterns]},
+        "log": {
+            "events": len(ocel.events),
+            "objects": len(ocel.objects),
+            "relations": len(ocel.relations),
+            "o2o": len(ocel.ocel.o2o),
+            "generation_time": round(generation_time, 6),
+        },
+        "runs": runs,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[10_000], help="Log sizes to benchmark")
+    parser.add_argument("--activities", type=int, default=10)
+    parser.add_argument("--object-types", type=int, default=3)
+    parser.add_argument("--objects-per-event", type=float, default=2.0)
+    parser.add_argument("--o2o-density", type=float, default=0.2)
+    parser.add_argument("--case-length", type=int, default=8)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=1, help="Warm-cache repetitions per method")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="JSON output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for events in args.events:
+        config = SyntheticConfig(
+            events=events,
+            activities=args.activities,
+            object_types=args.object_types,
+            objects_per_event=args.objects_per_event,
+            o2o_density=args.o2o_density,
+            case_length=args.case_length,
+            seed=args.seed,
+        )
+        results.append(run_config(config, args.threshold, args.repeat))
+
+    report = {
+        "plugin_version": version("oc_declare_plug"),
+        "oc_declare_version": version("oc_declare"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
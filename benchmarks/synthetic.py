@@ -0,0 +1,128 @@
+"""
+Scalable synthetic object-centric event logs with planted OC-DECLARE patterns.
+
+Every process instance ("case") owns one main object and a few related objects of other types.
+Its events are a random walk over the activities, after which every planted pattern is enforced
+on the case, e.g. an ``EF`` pattern inserts a target event after every source event.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+from ocelescope import OCEL
+from pm4py.objects.ocel.obj import OCEL as PM4PYOCEL
+
+ArcType = Literal["AS", "EF", "EP", "DF", "DP"]
+
+
+@dataclass(frozen=True)
+class Pattern:
+    type: ArcType
+    source: str
+    target: str
+
+
+@dataclass
+class SyntheticConfig:
+    events: int = 10_000
+    activities: int = 10
+    object_types: int = 3
+    objects_per_event: float = 2.0
+    o2o_density: float = 0.2
+    case_length: int = 8
+    seed: int = 0
+    patterns: list[Pattern] = field(default_factory=list)
+
+    @property
+    def activity_names(self) -> list[str]:
+        return [f"Activity {i}" for i in range(self.activities)]
+
+    @property
+    def object_type_names(self) -> list[str]:
+        return [f"Type {i}" for i in range(self.object_types)]
+
+    def default_patterns(self) -> list[Pattern]:
+        """One planted pattern per arc type, over the first activities."""
+        acts = self.activity_names
+        kinds = ["EF", "EP", "DF", "DP", "AS"]
+        return [Pattern(kind, acts[(2 * i) % len(acts)], acts[(2 * i + 1) % len(acts)]) for i, kind in enumerate(kinds)]
+
+
+def _plant(sequence: list[str], pattern: Pattern, rng: np.random.Generator) -> list[str]:
+    """Inserts a target event for every source event of the sequence, as the pattern demands."""
+    result = list(sequence)
+    i = 0
+    while i < len(result):
+        if result[i] != pattern.source:
+            i += 1
+            continue
+        match pattern.type:
+            case "DF":
+                insert_at = i + 1
+            case "DP":
+                insert_at = i
+            case "EF":
+                insert_at = int(rng.integers(i + 1, len(result) + 1))
+            case "EP":
+                insert_at = int(rng.integers(0, i + 1))
+            case _:
+                insert_at = int(rng.integers(0, len(result) + 1))
+        result.insert(insert_at, pattern.target)
+        # Continue after the source event, which moved right if the target was inserted before it
+        i += 2 if insert_at <= i else 1
+    return result
+
+
+def generate_ocel(config: SyntheticConfig) -> OCEL:
+    """Generates a synthetic OCEL with roughly ``config.events`` events."""
+    rng = np.random.default_rng(config.seed)
+    activities = config.activity_names
+    otypes = config.object_type_names
+    patterns = config.patterns or config.default_patterns()
+    extra_objects = max(0, math.ceil(config.objects_per_event) - 1)
+    # Probability of linking an event to each extra object, so events have objects_per_event objects on average
+    share = (config.objects_per_event - 1) / extra_objects if extra_objects else 0
+
+    events, objects, relations, o2o = [], [], [], []
+    start = pd.Timestamp("2024-01-01")
+    case = 0
+    while len(events) < config.events:
+        main = f"o{case}-0"
+        case_objects = [(main, otypes[0])]
+        objects.append((main, otypes[0]))
+        for j in range(1, extra_objects + 1):
+            oid, otype = f"o{case}-{j}", otypes[int(rng.integers(min(1, len(otypes) - 1), len(otypes)))]
+            case_objects.append((oid, otype))
+            objects.append((oid, otype))
+            if rng.random() < config.o2o_density:
+                o2o.append((main, oid, "part of"))
+
+        sequence = [str(activity) for activity in rng.choice(activities, size=config.case_length)]
+        for pattern in patterns:
+            sequence = _plant(sequence, pattern, rng)
+
+        time = start + pd.Timedelta(minutes=int(rng.integers(0, 60 * 24 * 365)))
+        for activity in sequence:
+            eid = f"e{len(events)}"
+            time += pd.Timedelta(minutes=int(rng.integers(1, 120)))
+            events.append((eid, activity, time))
+            # The main object is shared by every event of the case, extra objects are sampled
+            linked = [case_objects[0]]
+            linked += [obj for obj in case_objects[1:] if rng.random() < share]
+            relations.extend((eid, activity, time, oid, otype, "") for oid, otype in linked)
+        case += 1
+
+    events_df = pd.DataFrame(events, columns=["ocel:eid", "ocel:activity", "ocel:timestamp"])
+    objects_df = pd.DataFrame(objects, columns=["ocel:oid", "ocel:type"])
+    relations_df = pd.DataFrame(
+        relations,
+        columns=["ocel:eid", "ocel:activity", "ocel:timestamp", "ocel:oid", "ocel:type", "ocel:qualifier"],
+    )
+    o2o_df = pd.DataFrame(o2o, columns=["ocel:oid", "ocel:oid_2", "ocel:qualifier"])
+
+    ocel = OCEL(PM4PYOCEL(events=events_df, objects=objects_df, relations=relations_df, o2o=o2o_df))
+    ocel.meta = {"fileName": f"synthetic-{config.events}-{config.seed}"}
+    return ocel
@@ -1,3 +1,5 @@
+from .constraint_set import ConstraintSet
+from .monitor import ConformanceMonitor
 from .plugin import OcDeclare
 
 __author__ = "Görkem-Emre Öztürk"
@@ -5,5 +7,7 @@ __email__ = "goerkem.oeztuerk@rwth-aachen.de"
 
 
 __all__ = [
+    "ConformanceMonitor",
+    "ConstraintSet",
     "OcDeclare",
 ]
@@ -0,0 +1,188 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from threading import Lock
+
+import pandas as pd
+from ocelescope import OCEL
+
+from .config import settings
+from .handoff import LogTables, import_ocel
+from .profiling import Profiler
+from .snapshot import SnapshotStore
+
+_FINGERPRINT_TABLES = ("events", "objects", "relations", "o2o", "object_changes")
+
+# OCEL instance -> (state_id, fingerprint); the OCEL wrapper is treated as immutable per state_id
+_fingerprints: "weakref.WeakKeyDictionary[OCEL, tuple[str, str]]" = weakref.WeakKeyDictionary()
+_fingerprints_lock = Lock()
+
+
+def _hash_frame(frame: pd.DataFrame) -> bytes:
+    try:
+        hashes = pd.util.hash_pandas_object(frame, index=False)
+    except TypeError:
+        # Unhashable cell values (e.g. list-valued attributes)
+        hashes = pd.util.hash_pandas_object(frame.astype(str), index=False)
+    return hashes.to_numpy().tobytes()
+
+
+def ocel_fingerprint(ocel: OCEL) -> str:
+    """
+    Returns a content fingerprint of an OCEL.
+
+    Two logs with the same events, objects, relations and attribute values share a fingerprint,
+    regardless of their ocelescope id. The result is memoized per OCEL instance.
+    """
+    with _fingerprints_lock:
+        cached = _fingerprints.get(ocel)
+    if cached is not None and cached[0] == ocel.state_id:
+        return cached[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    for name in _FINGERPRINT_TABLES:
+        frame = getattr(ocel.ocel, name, None)
+        if frame is None:
+            continue
+        digest.update(name.encode())
+        digest.update("\x1f".join(map(str, frame.columns)).encode())
+        digest.update(_hash_frame(frame))
+    fingerprint = digest.hexdigest()
+
+    with _fingerprints_lock:
+        _fingerprints[ocel] = (ocel.state_id, fingerprint)
+    return fingerprint
+
+
+class ProcessedOCELCache:
+    """
+    Thread-safe LRU cache of imported ``oc_declare`` logs.
+
+    Entries are evicted in least-recently-used order as soon as either the entry budget or the
+    byte budget is exceeded. The size of an entry is the size of the file it was imported from,
+    which is a (generous) proxy of the memory held by the native log.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[object, int]] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def find(self, predicate: Callable[[Hashable], bool]):
+        """Returns the most recently used log whose key satisfies ``predicate``, or ``None``."""
+        with self._lock:
+            for key in reversed(self._entries):
+                if predicate(key):
+                    self._entries.move_to_end(key)
+                    return self._entries[key][0]
+            return None
+
+    def put(self, key: Hashable, processed, nbytes: int):
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if self.max_entries < 1 or nbytes > self.max_bytes:
+                return
+            self._entries[key] = (processed, nbytes)
+            self._size += nbytes
+            self._evict()
+
+    def configure(self, max_entries: int | None = None, max_bytes: int | None = None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._size -= nbytes
+
+
+processed_ocel_cache = ProcessedOCELCache(settings.cache_max_entries, settings.cache_max_bytes)
+
+snapshots = SnapshotStore(settings.snapshot_dir, settings.snapshot_max_bytes) if settings.snapshot_dir else None
+
+
+def load_processed(ocel: OCEL, profiler: Profiler | None = None, activities: Iterable[str] | None = None):
+    """
+    Returns the ``oc_declare`` pre-processed log of an OCEL.
+
+    Logs are looked up by content fingerprint in the process-wide ``processed_ocel_cache`` and only
+    exported and imported on a cache miss. If ``activities`` is given, the projection of the log to
+    what discovery and conformance checking among those activities depend on is sufficient (see
+    ``LogTables.project``): an already imported full log, or projection to more activities, is
+    reused for it, otherwise only the projection is imported. With a snapshot directory configured,
+    cache misses are served from (and saved to) the snapshot store.
+    """
+    profiler = profiler or Profiler()
+
+    with profiler.stage("fingerprint"):
+        fingerprint = ocel_fingerprint(ocel)
+    return load_processed_tables(fingerprint, LogTables.from_ocel(ocel), profiler, activities)
+
+
+def load_processed_tables(
+    fingerprint: str, log: LogTables, profiler: Profiler | None = None, activities: Iterable[str] | None = None
+):
+    """Returns the pre-processed log of the tables of a log with the given fingerprint (see ``load_processed``)."""
+    profiler = profiler or Profiler()
+
+    processed = processed_ocel_cache.get(fingerprint)
+    if processed is not None:
+        return processed
+
+    key: Hashable = fingerprint
+    if activities:
+        wanted = set(activities)
+        key = (fingerprint, tuple(sorted(wanted)))
+        # A projection to more activities serves as well
+        processed = processed_ocel_cache.find(
+            lambda cached: isinstance(cached, tuple) and cached[0] == fingerprint and wanted.issubset(cached[1])
+        )
+        if processed is not None:
+            return processed
+        with profiler.stage("project"):
+            log = log.project(key[1])
+
+    if snapshots is None:
+        processed, nbytes = import_ocel(log, profiler)
+    else:
+        # A snapshot of the full log serves projections as well
+        loaded = snapshots.load(fingerprint, profiler) if key != fingerprint else None
+        if loaded is None:
+            loaded = snapshots.load(key, profiler)
+        if loaded is None:
+            snapshots.save(key, log, profiler)
+            loaded = snapshots.load(key, profiler)
+        processed, nbytes = loaded
+    processed_ocel_cache.put(key, processed, nbytes)
+    return processed
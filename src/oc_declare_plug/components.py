@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from .handoff import EVENT_ID, OBJECT_ID, TARGET_OBJECT_ID, LogTables
+
+
+def connected_components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Labels the connected components of an undirected graph with nodes ``0..n-1`` and the edges
+    ``left[i] - right[i]``.
+
+    Every node is labelled with the smallest node of its component. Roots are hooked onto the
+    smallest neighbouring root and the resulting trees are flattened by pointer jumping, until no
+    edge connects two components.
+    """
+    labels = np.arange(n)
+    if not len(left):
+        return labels
+    left, right = np.asarray(left), np.asarray(right)
+    while True:
+        lowest = np.minimum(labels[left], labels[right])
+        np.minimum.at(labels, labels[left], lowest)
+        np.minimum.at(labels, labels[right], lowest)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if np.array_equal(labels[left], labels[right]):
+            return labels
+
+
+def _edges(log: LogTables) -> tuple[pd.Series, pd.Series]:
+    """Returns the object pairs connected by an event (as a chain over its objects) or by an O2O relationship."""
+    relations = log.relations[[EVENT_ID, OBJECT_ID]].sort_values(EVENT_ID, kind="stable")
+    same_event = relations[EVENT_ID].to_numpy()[1:] == relations[EVENT_ID].to_numpy()[:-1]
+    objects = relations[OBJECT_ID].to_numpy()
+    left = np.concatenate([objects[:-1][same_event], log.o2o[OBJECT_ID].to_numpy()])
+    right = np.concatenate([objects[1:][same_event], log.o2o[TARGET_OBJECT_ID].to_numpy()])
+    return pd.Series(left, dtype=object), pd.Series(right, dtype=object)
+
+
+class ObjectComponents:
+    """
+    Connected components of the objects of a log.
+
+    Two objects are connected if an event is related to both or if an O2O relationship links them.
+    Whether an event satisfies a constraint only depends on the events of its component, so a log
+    can be split along components, and appended events only affect the components they touch.
+    """
+
+    def __init__(self, labels: pd.Series):
+        self.labels = labels
+        self._next_label = int(labels.max()) + 1 if len(labels) else 0
+
+    @classmethod
+    def from_log(cls, log: LogTables) -> "ObjectComponents":
+        left, right = _edges(log)
+        nodes = pd.Index(
+            pd.concat([log.objects[OBJECT_ID], log.relations[OBJECT_ID], left, right], ignore_index=True).unique()
+        )
+        labels = connected_components(len(nodes), nodes.get_indexer(left), nodes.get_indexer(right))
+        return cls(pd.Series(labels, index=nodes))
+
+    def update(self, delta: LogTables) -> np.ndarray:
+        """
+        Adds the relations and O2O relationships of appended events and objects.
+
+        Returns the labels of the components they touch, which include every component merged by them.
+        """
+        left, right = _edges(delta)
+        involved = pd.Index(pd.concat([delta.relations[OBJECT_ID], left, right], ignore_index=True).unique())
+        if involved.empty:
+            return np.array([], dtype=np.int64)
+
+        known = self.labels.reindex(involved)
+        unknown = known.isna().to_numpy()
+        known[unknown] = np.arange(self._next_label, self._next_label + unknown.sum())
+        self._next_label += int(unknown.sum())
+        involved_labels = known.to_numpy(dtype=np.int64)
+
+        # Components merged by the new edges, labelled with their smallest label
+        nodes, codes = np.unique(involved_labels, return_inverse=True)
+        groups = connected_components(
+            len(nodes),
+            codes[involved.get_indexer(left)],
+            codes[involved.get_indexer(right)],
+        )
+        merged = pd.Series(nodes[groups], index=nodes)
+
+        changed = merged[merged.index != merged.to_numpy()]
+        if not changed.empty:
+            relabel = self.labels.isin(changed.index).to_numpy()
+            self.labels[relabel] = self.labels[relabel].map(changed).to_numpy()
+        new_objects = pd.Series(merged.reindex(involved_labels[unknown]).to_numpy(), index=involved[unknown])
+        self.labels = pd.concat([self.labels, new_objects])
+        return np.unique(merged.to_numpy())
+
+    def event_mask(self, log: LogTables, components: np.ndarray) -> pd.Series:
+        """Selects the events of a log that are related to an object of one of the given components."""
+        relations = log.relations
+        in_components = self.labels.reindex(relations[OBJECT_ID]).isin(components).to_numpy()
+        return log.events[EVENT_ID].isin(relations[EVENT_ID][in_components])
@@ -0,0 +1,122 @@
+import os
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+ENV_PREFIX = "OC_DECLARE_"
+
+
+class Settings(BaseModel):
+    """
+    Process-wide tuning knobs of the plugin.
+
+    Every field can be overridden through an environment variable named after the field,
+    prefixed with ``OC_DECLARE_`` (e.g. ``OC_DECLARE_CACHE_MAX_ENTRIES=8``).
+    """
+
+    cache_max_entries: int = Field(default=4, ge=0, description="Maximum number of imported logs kept in memory")
+    cache_max_bytes: int = Field(
+        default=8 * 1024**3,
+        ge=0,
+        description="Approximate memory budget (in bytes) of the imported log cache",
+    )
+    conformance_workers: int = Field(
+        default=1,
+        ge=1,
+        description="Number of workers that check constraints concurrently (1 checks sequentially)",
+    )
+    conformance_executor: Literal["thread", "process"] = Field(
+        default="thread",
+        description="Run conformance workers as threads or as processes that each import the log",
+    )
+    partition_workers: int = Field(
+        default=1,
+        ge=1,
+        description="Number of worker processes that discover and check constraints on shards of the log (1 disables)",
+    )
+    partition_timeout: float = Field(
+        default=3600,
+        gt=0,
+        description="Seconds a partition worker may take to answer a request before it is considered stuck",
+    )
+    handoff_mode: Literal["file", "stream"] = Field(
+        default="file",
+        description="Hand logs to oc_declare through a file, or stream them through a named pipe",
+    )
+    handoff_memory_max_bytes: int = Field(
+        default=2 * 1024**3,
+        ge=0,
+        description="Largest estimated handoff document (in bytes) kept in memory rather than on disk",
+    )
+    incremental_slack: float = Field(
+        default=0.1,
+        ge=0,
+        le=1,
+        description="Extra noise threshold at which incremental discovery keeps candidate constraints",
+    )
+    incremental_refresh_fraction: float = Field(
+        default=0.5,
+        gt=0,
+        description="Share of appended events after which incremental discovery starts over",
+    )
+    incremental_max_states: int = Field(
+        default=4,
+        ge=0,
+        description="Number of logs whose incremental discovery statistics are kept",
+    )
+    sample_slack: float = Field(
+        default=0.1,
+        ge=0,
+        le=1,
+        description="Extra noise threshold at which approximate discovery picks candidates on the sample",
+    )
+    sample_confidence: float = Field(
+        default=0.95,
+        gt=0,
+        lt=1,
+        description="Confidence level of the conformance intervals of approximate discovery",
+    )
+    result_cache_path: Path | None = Field(
+        default=None,
+        description="SQLite database in which conformance results are kept across restarts",
+    )
+    result_cache_max_entries: int = Field(
+        default=1_000_000,
+        ge=0,
+        description="Maximum number of conformance results kept in the result cache",
+    )
+    worker_address: Path | None = Field(
+        default=None,
+        description="Unix socket of a resident worker (python -m oc_declare_plug) that serves plugin calls",
+    )
+    worker_authkey: str | None = Field(
+        default=None,
+        description="Key the plugin authenticates with at the resident worker (a key file next to the socket if unset)",
+    )
+    worker_max_jobs: int = Field(
+        default=2,
+        ge=1,
+        description="Number of requests the resident worker computes concurrently",
+    )
+    snapshot_dir: Path | None = Field(
+        default=None,
+        description="Directory in which handoff documents of imported logs are kept across restarts",
+    )
+    snapshot_max_bytes: int = Field(
+        default=32 * 1024**3,
+        ge=0,
+        description="Disk budget (in bytes) of the snapshot directory",
+    )
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        values = {
+            name: os.environ[ENV_PREFIX + name.upper()]
+            for name in cls.model_fields
+            if ENV_PREFIX + name.upper() in os.environ
+        }
+        return cls.model_validate(values)
+
+
+settings = Settings.from_env()
@@ -0,0 +1,173 @@
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Literal
+
+import oc_declare
+import pandas as pd
+from oc_declare import OCDeclareArc
+
+from .config import settings
+from .constraints import Constraint, ConstraintKey
+from .handoff import ACTIVITY, LogTables, handoff_file, process_context
+
+
+def constraint_to_arc(c: Constraint) -> OCDeclareArc:
+    return c.to_arc()
+
+
+def _scan_order(key: ConstraintKey):
+    # Source activity first, then object type bindings: consecutive checks walk the same source events
+    arc_type, source, target, any_ots, all_ots, each_ots, min_count, max_count = key
+    return (source, any_ots, all_ots, each_ots, target, arc_type, min_count or 0, max_count or 0)
+
+
+def _check(processed, arc: OCDeclareArc, ndigits: int | None = 3) -> float | None:
+    try:
+        score = oc_declare.check_conformance(processed, arc)
+        return score if ndigits is None else round(score, ndigits)
+    except Exception as e:
+        print(f"⚠️ Failed to check conformance for {arc.from_activity} → {arc.to_activity}: {e}")
+        return None
+
+
+ArcSpec = tuple[str, str, str, int | None, int | None, list[str], list[str], list[str]]
+
+# Log of a conformance worker process, imported once when the worker starts
+_worker_processed = None
+
+
+def arc_spec(arc: OCDeclareArc) -> ArcSpec:
+    return (
+        arc.from_activity,
+        arc.to_activity,
+        arc.arc_type_name,
+        arc.min_count,
+        arc.max_count,
+        arc.all_ots,
+        arc.each_ots,
+        arc.any_ots,
+    )
+
+
+def _init_worker(path: str):
+    global _worker_processed
+    _worker_processed = oc_declare.import_ocel2(path)
+
+
+def spec_arc(spec: ArcSpec) -> OCDeclareArc:
+    from_act, to_act, arc_type, min_count, max_count, all_ots, each_ots, any_ots = spec
+    return oc_declare.OCDeclareArc(
+        from_act, to_act, arc_type, min_count, max_count, all_ots=all_ots, each_ots=each_ots, any_ots=any_ots
+    )
+
+
+def _check_spec(spec: ArcSpec, ndigits: int | None = 3) -> float | None:
+    return _check(_worker_processed, spec_arc(spec), ndigits)
+
+
+def _score_in_processes(
+    log: LogTables, arcs: Sequence[OCDeclareArc], workers: int, ndigits: int | None
+) -> list[float | None]:
+    # The native log cannot be sent to workers, so each one imports it from a single handoff document
+    chunksize = max(1, len(arcs) // (workers * 4))
+    with handoff_file(log) as (path, _):
+        with ProcessPoolExecutor(
+            workers, mp_context=process_context(), initializer=_init_worker, initargs=(str(path),)
+        ) as pool:
+            specs = [arc_spec(arc) for arc in arcs]
+            return list(pool.map(partial(_check_spec, ndigits=ndigits), specs, chunksize=chunksize))
+
+
+def score_arcs(
+    processed,
+    arcs: Sequence[OCDeclareArc],
+    workers: int | None = None,
+    executor: Literal["thread", "process"] | None = None,
+    ndigits: int | None = 3,
+    log: LogTables | None = None,
+) -> list[float | None]:
+    """
+    Checks the conformance of each arc against a pre-processed log.
+
+    With more than one worker (``settings.conformance_workers`` by default), the arcs are spread over
+    a thread pool, or over a pool of processes (see ``process_context``). Worker processes import the
+    log themselves, so they need its tables as ``log``; without them, a thread pool is used. Results
+    are always returned in the order of ``arcs``.
+
+    Returns the conformance per arc, rounded to ``ndigits`` (unless it is ``None``), or ``None`` for
+    arcs that could not be checked.
+    """
+    workers = settings.conformance_workers if workers is None else workers
+    executor = executor or settings.conformance_executor
+
+    if workers <= 1 or len(arcs) < 2:
+        return [_check(processed, arc, ndigits) for arc in arcs]
+    if executor == "process" and log is not None:
+        return _score_in_processes(log, arcs, workers, ndigits)
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(partial(_check, processed, ndigits=ndigits), arcs))
+
+
+# Satisfied and total number of source events of a constraint
+Counts = tuple[int, int]
+
+
+def count_satisfied(processed, events: pd.DataFrame, arcs: list[OCDeclareArc]) -> list[Counts | None]:
+    """
+    Returns how many source events of each arc satisfy it, and how many source events there are.
+
+    ``oc_declare`` reports the conformance of an arc as the fraction of its source events that satisfy
+    it, which is turned back into counts using the events of the (sub-)log it was imported from.
+    Arcs whose source or target activity has no events are not checked at all (``oc_declare`` fails
+    on them): without target events, a source event satisfies an arc if it requires none. Arcs that
+    could not be checked have no counts.
+    """
+    activities = events[ACTIVITY].value_counts()
+    totals = [int(activities.get(arc.from_activity, 0)) for arc in arcs]
+    checked = [arc for arc, total in zip(arcs, totals, strict=True) if total and arc.to_activity in activities.index]
+    scores = iter(score_arcs(processed, checked, ndigits=None))
+    counts: list[Counts | None] = []
+    for arc, total in zip(arcs, totals, strict=True):
+        if not total:
+            score = 0.0
+        elif arc.to_activity not in activities.index:
+            score = 0.0 if arc.min_count else 1.0
+        else:
+            score = next(scores)
+        counts.append(None if score is None else (round(score * total), total))
+    return counts
+
+
+def check_conformance_batch(
+    processed, constraints: Sequence[Constraint], log: LogTables | None = None
+) -> list[float | None]:
+    """
+    Checks the conformance of many constraints against a pre-processed log in one batch.
+
+    ``oc_declare`` only offers a per-arc conformance check, so the batch is reduced to the distinct
+    constraints (by canonical key), each of which is turned into a native arc and checked exactly
+    once. The distinct constraints are checked grouped by source activity and object type bindings
+    so that consecutive checks scan the same source events.
+
+    Returns the rounded conformance per input constraint, in input order.
+    """
+    distinct: dict[ConstraintKey, Constraint] = {}
+    for c in constraints:
+        distinct.setdefault(c.key(), c)
+
+    keys = sorted(distinct, key=_scan_order)
+    arcs: list[OCDeclareArc] = []
+    checked_keys: list[ConstraintKey] = []
+    results: dict[ConstraintKey, float | None] = {}
+    for key in keys:
+        c = distinct[key]
+        try:
+            arcs.append(constraint_to_arc(c))
+            checked_keys.append(key)
+        except Exception as e:
+            print(f"⚠️ Failed to check conformance for {c.source} → {c.target}: {e}")
+            results[key] = None
+
+    results.update(zip(checked_keys, score_arcs(processed, arcs, log=log), strict=True))
+    return [results[c.key()] for c in constraints]
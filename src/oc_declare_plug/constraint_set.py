@@ -0,0 +1,435 @@
+import itertools
+import sys
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Literal, get_args
+
+import numpy as np
+from oc_declare import OCDeclareArc
+
+from .constraints import ArcFields, Constraint, ConstraintKey, Constraints, O2OMode, arc_fields
+
+ARC_TYPES: tuple[str, ...] = get_args(Constraint.model_fields["type"].annotation)
+O2O_MODES: tuple[str, ...] = get_args(O2OMode)
+
+ObjectField = Literal["any_objects", "all_objects", "each_objects"]
+OBJECT_FIELDS: tuple[ObjectField, ...] = ("any_objects", "all_objects", "each_objects")
+
+# Missing min/max counts and O2O modes; counts are never negative
+_NONE = -1
+
+
+class _Interner:
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: list[str] = []
+        self.codes: dict[str, int] = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return code
+
+
+def _ragged(lists: Sequence[Sequence[str]], interner: _Interner) -> tuple[np.ndarray, np.ndarray]:
+    """Builds a ragged column of interned codes from one list of names per row."""
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(names) for names in lists], out=offsets[1:])
+    codes = np.fromiter(
+        (interner.code(name) for names in lists for name in names), dtype=np.int32, count=int(offsets[-1])
+    )
+    return offsets, codes
+
+
+def _counts(values: Sequence[int | None]) -> np.ndarray:
+    return np.fromiter((_NONE if v is None else v for v in values), dtype=np.int64, count=len(values))
+
+
+def _floats(values: Sequence[float | None]) -> np.ndarray:
+    return np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=len(values))
+
+
+def _take_ragged(offsets: np.ndarray, values: np.ndarray, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Selects rows of a ragged column, stored as ``values[offsets[i]:offsets[i + 1]]`` per row."""
+    starts, lengths = offsets[indices], np.diff(offsets)[indices]
+    new_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return new_offsets, values[positions]
+
+
+class ConstraintRow:
+    """Read-only view of one constraint of a ``ConstraintSet``, with the attributes of a ``Constraint``."""
+
+    __slots__ = ("_set", "_index")
+
+    def __init__(self, constraint_set: "ConstraintSet", index: int):
+        self._set = constraint_set
+        self._index = index
+
+    @property
+    def type(self) -> str:
+        return ARC_TYPES[self._set.types[self._index]]
+
+    @property
+    def source(self) -> str:
+        return self._set.activities[self._set.sources[self._index]]
+
+    @property
+    def target(self) -> str:
+        return self._set.activities[self._set.targets[self._index]]
+
+    @property
+    def any_objects(self) -> list[str]:
+        return self._set.object_types_of("any_objects", self._index)
+
+    @property
+    def all_objects(self) -> list[str]:
+        return self._set.object_types_of("all_objects", self._index)
+
+    @property
+    def each_objects(self) -> list[str]:
+        return self._set.object_types_of("each_objects", self._index)
+
+    @property
+    def min(self) -> int | None:
+        value = int(self._set.min[self._index])
+        return None if value == _NONE else value
+
+    @property
+    def max(self) -> int | None:
+        value = int(self._set.max[self._index])
+        return None if value == _NONE else value
+
+    @property
+    def conformance(self) -> float | None:
+        return self._set.float_at("conformance", self._index)
+
+    @property
+    def conformance_lower(self) -> float | None:
+        return self._set.float_at("conformance_lower", self._index)
+
+    @property
+    def conformance_upper(self) -> float | None:
+        return self._set.float_at("conformance_upper", self._index)
+
+    @property
+    def o2o_mode(self) -> O2OMode | None:
+        code = int(self._set.o2o_modes[self._index])
+        return None if code == _NONE else O2O_MODES[code]
+
+    def key(self) -> ConstraintKey:
+        """Returns the canonical key of the constraint (see ``Constraint.key``)."""
+        return (
+            self.type,
+            self.source,
+            self.target,
+            tuple(sorted(self.any_objects)),
+            tuple(sorted(self.all_objects)),
+            tuple(sorted(self.each_objects)),
+            self.min,
+            self.max,
+        )
+
+    def to_constraint(self) -> Constraint:
+        return Constraint(
+            type=self.type,
+            source=self.source,
+            target=self.target,
+            any_objects=self.any_objects,
+            all_objects=self.all_objects,
+            each_objects=self.each_objects,
+            min=self.min,
+            max=self.max,
+            conformance=self.conformance,
+            conformance_lower=self.conformance_lower,
+            conformance_upper=self.conformance_upper,
+            o2o_mode=self.o2o_mode,
+        )
+
+    def __repr__(self) -> str:
+        return f"ConstraintRow({self.type}, {self.source} → {self.target})"
+
+
+class ConstraintSet:
+    """
+    Columnar store of many constraints.
+
+    Activities and object types are interned once per set and referenced by integer codes. Arc
+    types and O2O modes are small integer codes, missing counts and modes are ``-1`` and missing
+    conformance values are NaN. The object types of each constraint are ragged columns: the codes
+    of row ``i`` are ``codes[offsets[i]:offsets[i + 1]]``.
+
+    Rows are available as ``ConstraintRow`` views, and the set converts to and from lists of
+    ``Constraint`` and the ``Constraints`` resource. A set mapped from native arcs keeps them in
+    ``arcs``, row for row; pickling a set drops them.
+    """
+
+    def __init__(
+        self,
+        activities: list[str],
+        object_types: list[str],
+        types: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        objects: dict[ObjectField, tuple[np.ndarray, np.ndarray]],
+        min: np.ndarray,
+        max: np.ndarray,
+        conformance: np.ndarray,
+        conformance_lower: np.ndarray,
+        conformance_upper: np.ndarray,
+        o2o_modes: np.ndarray,
+        arcs: list[OCDeclareArc] | None = None,
+    ):
+        self.activities = activities
+        self.object_types = object_types
+        self.types = types
+        self.sources = sources
+        self.targets = targets
+        self.objects = objects
+        self.min = min
+        self.max = max
+        self.conformance = conformance
+        self.conformance_lower = conformance_lower
+        self.conformance_upper = conformance_upper
+        self.o2o_modes = o2o_modes
+        self.arcs = arcs
+
+    @classmethod
+    def from_constraints(cls, constraints: Iterable[Constraint | ConstraintRow]) -> "ConstraintSet":
+        constraints = list(constraints)
+        activities, object_types = _Interner(), _Interner()
+        arc_types, modes = {t: i for i, t in enumerate(ARC_TYPES)}, {m: i for i, m in enumerate(O2O_MODES)}
+
+        def column(name: str) -> list:
+            return [getattr(c, name) for c in constraints]
+
+        return cls(
+            activities=activities.names,
+            object_types=object_types.names,
+            types=np.array([arc_types[c.type] for c in constraints], dtype=np.int8),
+            sources=np.array([activities.code(c.source) for c in constraints], dtype=np.int32),
+            targets=np.array([activities.code(c.target) for c in constraints], dtype=np.int32),
+            objects={field: _ragged(column(field), object_types) for field in OBJECT_FIELDS},
+            min=_counts(column("min")),
+            max=_counts(column("max")),
+            conformance=_floats(column("conformance")),
+            conformance_lower=_floats(column("conformance_lower")),
+            conformance_upper=_floats(column("conformance_upper")),
+            o2o_modes=np.array(
+                [_NONE if c.o2o_mode is None else modes[c.o2o_mode] for c in constraints], dtype=np.int8
+            ),
+        )
+
+    @classmethod
+    def from_fields(cls, fields: Sequence[ArcFields], arcs: Sequence[OCDeclareArc] | None = None) -> "ConstraintSet":
+        """
+        Builds a set from the fields of native arcs (see ``arc_fields``), optionally keeping the arcs.
+
+        Arcs returned by ``oc_declare`` are trusted, so their fields go into the columns as they are.
+        """
+        activities, object_types = _Interner(), _Interner()
+        arc_types = {t: i for i, t in enumerate(ARC_TYPES)}
+        size = len(fields)
+        types, sources, targets, any_ots, all_ots, each_ots, mins, maxs = (
+            zip(*fields, strict=True) if size else [()] * 8
+        )
+        missing = np.full(size, np.nan)
+        return cls(
+            activities=activities.names,
+            object_types=object_types.names,
+            types=np.fromiter((arc_types[t] for t in types), dtype=np.int8, count=size),
+            sources=np.fromiter(map(activities.code, sources), dtype=np.int32, count=size),
+            targets=np.fromiter(map(activities.code, targets), dtype=np.int32, count=size),
+            objects={
+                field: _ragged(lists, object_types)
+                for field, lists in zip(OBJECT_FIELDS, (any_ots, all_ots, each_ots), strict=True)
+            },
+            min=_counts(mins),
+            max=_counts(maxs),
+            conformance=missing,
+            conformance_lower=missing.copy(),
+            conformance_upper=missing.copy(),
+            o2o_modes=np.full(size, _NONE, dtype=np.int8),
+            arcs=None if arcs is None else list(arcs),
+        )
+
+    @classmethod
+    def from_arcs(cls, arcs: Iterable[OCDeclareArc]) -> "ConstraintSet":
+        """Maps native arcs to a set in bulk, keeping the arcs (see ``from_fields``)."""
+        arcs = list(arcs)
+        return cls.from_fields(list(map(arc_fields, arcs)), arcs)
+
+    @classmethod
+    def from_resource(cls, resource: Constraints) -> "ConstraintSet":
+        return cls.from_constraints(resource.constraints)
+
+    def object_lists(self, field: ObjectField) -> list[list[str]]:
+        """Returns the object types of every row in one of the ragged columns."""
+        offsets, codes = self.objects[field]
+        names = [self.object_types[code] for code in codes.tolist()]
+        bounds = offsets.tolist()
+        return [names[start:end] for start, end in itertools.pairwise(bounds)]
+
+    def to_constraints(self) -> list[Constraint]:
+        """
+        Returns the constraints of the set, sharing its interned names.
+
+        The columns only hold valid values, so the constraints are built without validation. Sets
+        mapped from native arcs (see ``from_fields``) memoize the arcs on the constraints.
+        """
+
+        def optional(values: np.ndarray) -> list:
+            return [None if v == _NONE else v for v in values.tolist()]
+
+        def floats(values: np.ndarray) -> list:
+            return [None if v != v else v for v in values.tolist()]
+
+        activities = self.activities
+        rows = zip(
+            self.types.tolist(),
+            self.sources.tolist(),
+            self.targets.tolist(),
+            *(self.object_lists(field) for field in OBJECT_FIELDS),
+            optional(self.min),
+            optional(self.max),
+            floats(self.conformance),
+            floats(self.conformance_lower),
+            floats(self.conformance_upper),
+            self.o2o_modes.tolist(),
+            strict=True,
+        )
+        constraints = [
+            Constraint.model_construct(
+                type=ARC_TYPES[arc_type],
+                source=activities[source],
+                target=activities[target],
+                any_objects=any_ots,
+                all_objects=all_ots,
+                each_objects=each_ots,
+                min=min_count,
+                max=max_count,
+                conformance=conformance,
+                conformance_lower=lower,
+                conformance_upper=upper,
+                o2o_mode=None if mode == _NONE else O2O_MODES[mode],
+            )
+            for (
+                arc_type,
+                source,
+                target,
+                any_ots,
+                all_ots,
+                each_ots,
+                min_count,
+                max_count,
+                conformance,
+                lower,
+                upper,
+                mode,
+            ) in rows
+        ]
+        if self.arcs is not None:
+            for c, arc in zip(constraints, self.arcs, strict=True):
+                c.attach_arc(arc)
+        return constraints
+
+    def to_resource(self, **fields) -> Constraints:
+        """Returns a ``Constraints`` resource of the set; ``fields`` (e.g. ``threshold``) are passed on."""
+        return Constraints(constraints=self.to_constraints(), **fields)
+
+    def object_types_of(self, field: ObjectField, index: int) -> list[str]:
+        offsets, codes = self.objects[field]
+        return [self.object_types[code] for code in codes[offsets[index] : offsets[index + 1]]]
+
+    def float_at(self, column: str, index: int) -> float | None:
+        value = float(getattr(self, column)[index])
+        return None if np.isnan(value) else value
+
+    def take(self, indices: Sequence[int] | np.ndarray) -> "ConstraintSet":
+        """Returns the set of the selected rows (by index or boolean mask), sharing the string tables."""
+        selection = np.asarray(indices)
+        # An empty list of indices would otherwise be taken for an array of floats
+        indices = np.arange(len(self))[selection if selection.dtype == bool else selection.astype(np.intp)]
+        return ConstraintSet(
+            activities=self.activities,
+            object_types=self.object_types,
+            types=self.types[indices],
+            sources=self.sources[indices],
+            targets=self.targets[indices],
+            objects={field: _take_ragged(*self.objects[field], indices) for field in OBJECT_FIELDS},
+            min=self.min[indices],
+            max=self.max[indices],
+            conformance=self.conformance[indices],
+            conformance_lower=self.conformance_lower[indices],
+            conformance_upper=self.conformance_upper[indices],
+            o2o_modes=self.o2o_modes[indices],
+            arcs=None if self.arcs is None else [self.arcs[i] for i in indices.tolist()],
+        )
+
+    def to_columns(self) -> dict:
+        """Returns the set as a dict of plain lists, a compact JSON-serializable form of it."""
+        columns = {
+            "activities": list(self.activities),
+            "object_types": list(self.object_types),
+            "types": self.types.tolist(),
+            "sources": self.sources.tolist(),
+            "targets": self.targets.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+            "o2o_modes": self.o2o_modes.tolist(),
+        }
+        for name in ("conformance", "conformance_lower", "conformance_upper"):
+            values = getattr(self, name)
+            columns[name] = [None if np.isnan(v) else v for v in values.tolist()]
+        for field in OBJECT_FIELDS:
+            offsets, codes = self.objects[field]
+            columns[field] = {"offsets": offsets.tolist(), "codes": codes.tolist()}
+        return columns
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "ConstraintSet":
+        def floats(name: str) -> np.ndarray:
+            return np.array([np.nan if v is None else v for v in columns[name]], dtype=np.float64)
+
+        return cls(
+            activities=[sys.intern(name) for name in columns["activities"]],
+            object_types=[sys.intern(name) for name in columns["object_types"]],
+            types=np.array(columns["types"], dtype=np.int8),
+            sources=np.array(columns["sources"], dtype=np.int32),
+            targets=np.array(columns["targets"], dtype=np.int32),
+            objects={
+                field: (
+                    np.array(columns[field]["offsets"], dtype=np.int64),
+                    np.array(columns[field]["codes"], dtype=np.int32),
+                )
+                for field in OBJECT_FIELDS
+            },
+            min=np.array(columns["min"], dtype=np.int64),
+            max=np.array(columns["max"], dtype=np.int64),
+            conformance=floats("conformance"),
+            conformance_lower=floats("conformance_lower"),
+            conformance_upper=floats("conformance_upper"),
+            o2o_modes=np.array(columns["o2o_modes"], dtype=np.int8),
+        )
+
+    def __getstate__(self) -> dict:
+        # Native arcs cannot be pickled; constraints rebuild them when needed (see ``Constraint.to_arc``)
+        return {**self.__dict__, "arcs": None}
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> ConstraintRow:
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return ConstraintRow(self, index % len(self))
+
+    def __iter__(self) -> Iterator[ConstraintRow]:
+        return (ConstraintRow(self, i) for i in range(len(self)))
+
+
+def map_ocdeclarearcs_to_constraints(arcs: Iterable[OCDeclareArc]) -> list[Constraint]:
+    """Maps many native arcs to constraints at once (see ``ConstraintSet.from_arcs``), keeping the arcs."""
+    return ConstraintSet.from_arcs(arcs).to_constraints()
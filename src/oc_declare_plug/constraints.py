@@ -0,0 +1,195 @@
+import operator
+from collections.abc import Callable
+from typing import Literal
+
+from oc_declare import OCDeclareArc
+from ocelescope import Resource, Table, TableColumn
+from pydantic import BaseModel, PrivateAttr
+
+from .profiling import StageMetric
+
+O2OMode = Literal["None", "Direct", "Reversed", "Bidirectional"]
+
+ConstraintKey = tuple[str, str, str, tuple[str, ...], tuple[str, ...], tuple[str, ...], int | None, int | None]
+
+
+class _ArcHandle:
+    """
+    Native arc memoized on a constraint, together with the key it was built for.
+
+    The handle is a cache: all handles compare equal, copies share the arc, and pickling drops it.
+    """
+
+    __slots__ = ("arc", "key")
+
+    def __init__(self, arc: OCDeclareArc | None = None, key: ConstraintKey | None = None):
+        self.arc = arc
+        self.key = key
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _ArcHandle)
+
+    def __hash__(self) -> int:
+        return 0
+
+    def __deepcopy__(self, memo) -> "_ArcHandle":
+        return _ArcHandle(self.arc, self.key)
+
+    def __reduce__(self):
+        return _ArcHandle, ()
+
+
+class Constraint(BaseModel):
+    type: Literal["AS", "EF", "EP", "DF", "DP"]
+    source: str
+    target: str
+    any_objects: list[str] = []
+    all_objects: list[str] = []
+    each_objects: list[str] = []
+    min: int | None
+    max: int | None
+    conformance: float | None = None
+    conformance_lower: float | None = None
+    conformance_upper: float | None = None
+    o2o_mode: O2OMode | None = None
+
+    _arc: _ArcHandle = PrivateAttr(default_factory=_ArcHandle)
+
+    def key(self) -> ConstraintKey:
+        """
+        Returns a canonical key of the constraint.
+
+        Constraints with equal keys describe the same OC-DECLARE arc, regardless of the order in which
+        their object types are listed, of their conformance value or of the O2O mode they were
+        discovered with.
+        """
+        return (
+            self.type,
+            self.source,
+            self.target,
+            tuple(sorted(self.any_objects)),
+            tuple(sorted(self.all_objects)),
+            tuple(sorted(self.each_objects)),
+            self.min,
+            self.max,
+        )
+
+    def to_arc(self) -> OCDeclareArc:
+        """
+        Returns the native ``oc_declare`` arc of the constraint.
+
+        The arc is built once and reused for as long as the key of the constraint does not change.
+        Constraints mapped from discovered arcs reuse the discovered arc itself.
+        """
+        key = self.key()
+        if self._arc.arc is None or self._arc.key != key:
+            arc = OCDeclareArc(
+                self.source,
+                self.target,
+                self.type,
+                self.min,
+                self.max,
+                all_ots=self.all_objects,
+                each_ots=self.each_objects,
+                any_ots=self.any_objects,
+            )
+            self._arc = _ArcHandle(arc, key)
+        return self._arc.arc
+
+    def attach_arc(self, arc: OCDeclareArc, key: ConstraintKey | None = None):
+        """Memoizes the native arc the constraint was mapped from (see ``to_arc``)."""
+        self._arc = _ArcHandle(arc, key or self.key())
+
+
+# Reads every attribute of a native arc that a Constraint needs in a single call
+arc_fields: Callable[[OCDeclareArc], "ArcFields"] = operator.attrgetter(
+    "arc_type_name", "from_activity", "to_activity", "any_ots", "all_ots", "each_ots", "min_count", "max_count"
+)
+
+ArcFields = tuple[str, str, str, list[str], list[str], list[str], int | None, int | None]
+
+
+def fields_key(fields: ArcFields) -> ConstraintKey:
+    """Returns the canonical key (see ``Constraint.key``) of the fields of a native arc."""
+    arc_type, source, target, any_ots, all_ots, each_ots, min_count, max_count = fields
+    return (
+        arc_type,
+        source,
+        target,
+        tuple(sorted(any_ots)),
+        tuple(sorted(all_ots)),
+        tuple(sorted(each_ots)),
+        min_count,
+        max_count,
+    )
+
+
+def arc_key(arc: OCDeclareArc) -> ConstraintKey:
+    """Returns the canonical key (see ``Constraint.key``) of a native arc."""
+    return fields_key(arc_fields(arc))
+
+
+def map_ocdeclarearc_to_constraint(arc: OCDeclareArc) -> Constraint:
+    return Constraint(
+        type=arc.arc_type_name,
+        source=arc.from_activity,
+        target=arc.to_activity,
+        any_objects=arc.any_ots,
+        all_objects=arc.all_ots,
+        each_objects=arc.each_ots,
+        min=arc.min_count,
+        max=arc.max_count,
+    )
+
+
+class Constraints(Resource):
+    label = "OC-DECLARE Constraints"
+    description = "A list of discovered OC-DECLARE constraints"
+
+    constraints: list[Constraint]
+    threshold: float | None = None
+    metrics: list[StageMetric] | None = None
+
+    def visualize(self) -> Table:
+        columns = [
+            TableColumn(id="type", label="Type", sortable=True),
+            TableColumn(id="source", label="Source Activity", sortable=True),
+            TableColumn(id="target", label="Target Activity", sortable=True),
+            TableColumn(id="all", label="ALL"),
+            TableColumn(id="each", label="EACH"),
+            TableColumn(id="any", label="ANY"),
+            TableColumn(id="min", label="Min Count", data_type="number"),
+            TableColumn(id="max", label="Max Count", data_type="number"),
+        ]
+
+        # Add optional conformance, confidence interval and O2O mode columns
+        if any(c.conformance is not None for c in self.constraints):
+            columns.append(TableColumn(id="conformance", label="Conformance", data_type="number"))
+        if any(c.conformance_lower is not None for c in self.constraints):
+            columns.append(TableColumn(id="conformance_lower", label="Conformance (Lower)", data_type="number"))
+            columns.append(TableColumn(id="conformance_upper", label="Conformance (Upper)", data_type="number"))
+        if any(c.o2o_mode is not None for c in self.constraints):
+            columns.append(TableColumn(id="o2o_mode", label="O2O Mode", sortable=True))
+
+        rows = []
+        for c in self.constraints:
+            row = {
+                "type": c.type,
+                "source": c.source,
+                "target": c.target,
+                "all": ", ".join(c.all_objects),
+                "any": ", ".join(c.any_objects),
+                "each": ", ".join(c.each_objects),
+                "min": c.min,
+                "max": c.max,
+            }
+            if c.conformance is not None:
+                row["conformance"] = c.conformance
+            if c.conformance_lower is not None:
+                row["conformance_lower"] = c.conformance_lower
+                row["conformance_upper"] = c.conformance_upper
+            if c.o2o_mode is not None:
+                row["o2o_mode"] = c.o2o_mode
+            rows.append(row)
+
+        return Table(columns=columns, rows=rows)
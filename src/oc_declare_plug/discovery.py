@@ -0,0 +1,63 @@
+from collections.abc import Iterable
+
+import oc_declare
+from oc_declare import OCDeclareArc
+
+from .conformance import score_arcs
+from .constraint_set import ConstraintSet
+from .constraints import ArcFields, Constraint, ConstraintKey, O2OMode, arc_fields, fields_key
+from .handoff import LogTables
+from .profiling import Profiler
+
+DiscoveryRun = tuple[float, O2OMode]
+
+
+def discover_runs(
+    processed,
+    runs: Iterable[DiscoveryRun],
+    acts_to_use: list[str] | None = None,
+    check_conformance: bool = False,
+    profiler: Profiler | None = None,
+    log: LogTables | None = None,
+) -> dict[DiscoveryRun, list[Constraint]]:
+    """
+    Discovers constraints for several (threshold, O2O mode) combinations on one pre-processed log.
+
+    Every distinct arc is mapped to a Constraint (in bulk, through a ``ConstraintSet``) and checked
+    for conformance only once, no matter how many runs discover it. Each run gets its own Constraint
+    objects, tagged with the O2O mode of the run. The tables of the log (``log``) let conformance be
+    checked in worker processes (see ``score_arcs``), unless a run uses O2O relationships: arcs are
+    sent to workers by their fields, which cannot express O2O bindings.
+    """
+    profiler = profiler or Profiler()
+    runs = list(dict.fromkeys(runs))
+    o2o_free = all(o2o_mode == "None" for _, o2o_mode in runs)
+
+    with profiler.stage("discover"):
+        arcs_per_run = {
+            (threshold, o2o_mode): oc_declare.discover(processed, threshold, acts_to_use=acts_to_use, o2o_mode=o2o_mode)
+            for threshold, o2o_mode in runs
+        }
+
+    with profiler.stage("map"):
+        distinct: dict[ConstraintKey, tuple[OCDeclareArc, ArcFields]] = {}
+        keys_per_run: dict[DiscoveryRun, list[ConstraintKey]] = {}
+        for run, arcs in arcs_per_run.items():
+            fields = list(map(arc_fields, arcs))
+            keys = keys_per_run[run] = list(map(fields_key, fields))
+            for key, arc, arc_field in zip(keys, arcs, fields, strict=True):
+                if key not in distinct:
+                    distinct[key] = (arc, arc_field)
+        arcs, fields = zip(*distinct.values(), strict=True) if distinct else ((), ())
+        constraints = dict(zip(distinct, ConstraintSet.from_fields(fields, arcs).to_constraints(), strict=True))
+
+    if check_conformance:
+        with profiler.stage("conformance"):
+            scores = score_arcs(processed, [arc for arc, _ in distinct.values()], log=log if o2o_free else None)
+        for c, score in zip(constraints.values(), scores, strict=True):
+            c.conformance = score
+
+    return {
+        run: [constraints[key].model_copy(update={"o2o_mode": run[1]}) for key in keys]
+        for run, keys in keys_per_run.items()
+    }
@@ -0,0 +1,304 @@
+import multiprocessing
+import os
+import tempfile
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, TextIO
+
+import numpy as np
+import oc_declare
+import pandas as pd
+from ocelescope import OCEL
+
+from .config import settings
+from .profiling import Profiler
+
+EVENT_ID = "ocel:eid"
+ACTIVITY = "ocel:activity"
+TIMESTAMP = "ocel:timestamp"
+OBJECT_ID = "ocel:oid"
+OBJECT_TYPE = "ocel:type"
+QUALIFIER = "ocel:qualifier"
+TARGET_OBJECT_ID = "ocel:oid_2"
+
+# Approximate size of an entity in the handoff document, assuming identifiers of about 20 characters
+_EVENT_BYTES = 160
+_OBJECT_BYTES = 120
+_RELATIONSHIP_BYTES = 80
+
+# In-memory filesystem for handoff documents; the native importer picks its parser by file extension,
+# so documents need a real name ending in .json (which rules out anonymous files opened through /proc)
+_SHM_DIR = Path("/dev/shm")
+_HAS_SHM = _SHM_DIR.is_dir() and os.access(_SHM_DIR, os.W_OK)
+
+
+def process_context() -> multiprocessing.context.BaseContext:
+    """
+    Returns the context in which worker processes that call ``oc_declare`` are started.
+
+    Processes are never forked from a process that may have called ``oc_declare`` already: a forked
+    child inherits the native thread pool without its threads and blocks on its first native call.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _encode(values: pd.Series) -> np.ndarray:
+    """Encodes a column as JSON string literals, encoding every distinct value only once."""
+    codes, uniques = pd.factorize(values.fillna("").astype(str))
+    encoded = np.array([encode_basestring(value) for value in uniques] + ['""'], dtype=object)
+    return encoded[codes]
+
+
+def _encode_times(values: pd.Series) -> np.ndarray:
+    times = pd.to_datetime(values)
+    if times.dt.tz is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    literals = np.datetime_as_string(times.to_numpy(dtype="datetime64[us]"), unit="us")
+    return ('"' + literals.astype(object) + '+00:00"').astype(object)
+
+
+def _relationships(owner: pd.Series, targets: pd.Series, qualifiers: pd.Series) -> pd.Series:
+    """Returns the JSON relationship array body per owner id."""
+    if owner.empty:
+        return pd.Series(dtype=object)
+    fragments = '{"objectId":' + _encode(targets) + ',"qualifier":' + _encode(qualifiers) + "}"
+    return pd.Series(fragments, index=owner.to_numpy()).groupby(level=0, sort=False).agg(",".join)
+
+
+def _types(names: pd.Series) -> str:
+    return ",".join(f'{{"name":{encode_basestring(name)},"attributes":[]}}' for name in names.dropna().unique())
+
+
+def _write_entities(fp: TextIO, heads: np.ndarray, relationships: np.ndarray, chunk_size: int):
+    for start in range(0, len(heads), chunk_size):
+        if start:
+            fp.write(",")
+        fp.write(",".join(heads[start : start + chunk_size] + relationships[start : start + chunk_size] + "]}"))
+
+
+class LogTables(NamedTuple):
+    """The OCEL tables that make up an ``oc_declare`` handoff document."""
+
+    events: pd.DataFrame
+    objects: pd.DataFrame
+    relations: pd.DataFrame
+    o2o: pd.DataFrame
+
+    @classmethod
+    def from_ocel(cls, ocel: OCEL) -> "LogTables":
+        return cls(ocel.ocel.events, ocel.ocel.objects, ocel.ocel.relations, ocel.ocel.o2o)
+
+    def with_events(self, mask: pd.Series) -> "LogTables":
+        """
+        Returns the sub-log of the selected events.
+
+        The sub-log keeps the E2O relationships of the selected events, the objects they touch and
+        every O2O relationship incident to one of those objects (together with the object on the
+        other end), so all O2O modes see the same neighbourhood as on the full log.
+        """
+        events = self.events[mask.to_numpy()]
+        relations = self.relations[self.relations[EVENT_ID].isin(events[EVENT_ID])]
+        touched = relations[OBJECT_ID]
+        o2o = self.o2o[self.o2o[OBJECT_ID].isin(touched) | self.o2o[TARGET_OBJECT_ID].isin(touched)]
+        object_ids = pd.concat([relations[OBJECT_ID], o2o[OBJECT_ID], o2o[TARGET_OBJECT_ID]])
+        objects = self.objects[self.objects[OBJECT_ID].isin(object_ids)]
+        return LogTables(events, objects, relations, o2o)
+
+    def project(self, activities: Collection[str]) -> "LogTables":
+        """
+        Returns the sub-log that discovery and conformance checking among ``activities`` depend on.
+
+        That is every event that shares an object with an event of ``activities``, together with
+        the sub-log of those events (see ``with_events``). Each object of such an event keeps all its
+        events, so which events directly follow or precede each other on it stays the same as on the
+        full log. Leaving out just the events of other activities would make events adjacent that
+        are not.
+        """
+        selected = self.events[ACTIVITY].isin(list(activities))
+        relations = self.relations
+        used_objects = relations.loc[relations[EVENT_ID].isin(self.events.loc[selected, EVENT_ID]), OBJECT_ID]
+        sharing = relations.loc[relations[OBJECT_ID].isin(used_objects), EVENT_ID]
+        return self.with_events(selected | self.events[EVENT_ID].isin(sharing))
+
+
+def write_ocel_json(log: LogTables, fp: TextIO, chunk_size: int = 100_000):
+    """
+    Writes an OCEL 2.0 JSON document that ``oc_declare.import_ocel2`` can read, straight from the
+    OCEL DataFrames.
+
+    Only what ``oc_declare`` pre-processes is written: event and object types, event times, E2O and
+    O2O relationships. Attribute values are never read by discovery or conformance checking, so they
+    are left out. Entities are encoded column-wise and written in chunks of ``chunk_size``, so no
+    document-sized intermediate structure is ever built.
+    """
+    events, objects, relations, o2o = log
+
+    e2o_json = _relationships(relations[EVENT_ID], relations[OBJECT_ID], relations[QUALIFIER])
+    o2o_json = _relationships(o2o[OBJECT_ID], o2o[TARGET_OBJECT_ID], o2o[QUALIFIER])
+
+    fp.write(f'{{"eventTypes":[{_types(events[ACTIVITY])}],"objectTypes":[{_types(objects[OBJECT_TYPE])}],"events":[')
+    event_heads = (
+        '{"id":'
+        + _encode(events[EVENT_ID])
+        + ',"type":'
+        + _encode(events[ACTIVITY])
+        + ',"time":'
+        + _encode_times(events[TIMESTAMP])
+        + ',"attributes":[],"relationships":['
+    )
+    event_relationships = e2o_json.reindex(events[EVENT_ID].to_numpy()).fillna("").to_numpy(dtype=object)
+    _write_entities(fp, event_heads, event_relationships, chunk_size)
+
+    fp.write('],"objects":[')
+    object_heads = (
+        '{"id":'
+        + _encode(objects[OBJECT_ID])
+        + ',"type":'
+        + _encode(objects[OBJECT_TYPE])
+        + ',"attributes":[],"relationships":['
+    )
+    object_relationships = o2o_json.reindex(objects[OBJECT_ID].to_numpy()).fillna("").to_numpy(dtype=object)
+    _write_entities(fp, object_heads, object_relationships, chunk_size)
+    fp.write("]}")
+
+
+def export_ocel(log: LogTables, path: Path) -> int:
+    """Writes the handoff document of a log to ``path`` and returns its size in bytes."""
+    with open(path, "w", encoding="utf-8") as fp:
+        write_ocel_json(log, fp)
+    return path.stat().st_size
+
+
+def estimate_size(log: LogTables) -> int:
+    """Estimates the size of the handoff document of a log in bytes, without writing it."""
+    relationships = len(log.relations) + len(log.o2o)
+    return len(log.events) * _EVENT_BYTES + len(log.objects) * _OBJECT_BYTES + relationships * _RELATIONSHIP_BYTES
+
+
+def _shm_fits(size: int) -> bool:
+    if not _HAS_SHM or size > settings.handoff_memory_max_bytes:
+        return False
+    # The shared memory filesystem may be small, e.g. 64 MB by default in Docker containers
+    stats = os.statvfs(_SHM_DIR)
+    return size <= stats.f_bavail * stats.f_frsize
+
+
+def _temporary_json(directory: Path | None) -> Path:
+    fd, name = tempfile.mkstemp(suffix=".json", dir=directory)
+    os.close(fd)
+    return Path(name)
+
+
+def _write_handoff(log: LogTables) -> tuple[Path, str, int]:
+    if _shm_fits(estimate_size(log)):
+        path = _temporary_json(_SHM_DIR)
+        try:
+            return path, "memory", export_ocel(log, path)
+        except OSError:
+            # The estimate was too low, or the space was taken in the meantime
+            path.unlink(missing_ok=True)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+    path = _temporary_json(None)
+    try:
+        return path, "disk", export_ocel(log, path)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def handoff_file(log: LogTables, profiler: Profiler | None = None) -> Iterator[tuple[Path, int]]:
+    """
+    Writes the handoff document of a log to a temporary file and yields its path and size in bytes.
+
+    Documents estimated to fit both ``settings.handoff_memory_max_bytes`` and the free space of the
+    shared memory filesystem are written there, everything else (and documents that do not fit after
+    all) to the temporary directory. The ``"export"`` stage records where the document was stored.
+    The file is always deleted afterwards.
+    """
+    profiler = profiler or Profiler()
+    with profiler.stage("export") as stage:
+        path, storage, nbytes = _write_handoff(log)
+        stage.update(nbytes=nbytes, storage=storage)
+    try:
+        yield path, nbytes
+    finally:
+        path.unlink(missing_ok=True)
+
+
+class _CountingWriter:
+    """Text writer on top of a binary stream that counts the encoded bytes."""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.nbytes = 0
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        self.raw.write(data)
+        self.nbytes += len(data)
+
+
+def _stream_to_fifo(log: LogTables, path: Path, written):
+    # Runs in a writer process; opening blocks until the importer opens the other end
+    with open(path, "wb", buffering=1024 * 1024) as raw:
+        writer = _CountingWriter(raw)
+        write_ocel_json(log, writer)
+    written.value = writer.nbytes
+
+
+def _import_streaming(log: LogTables, profiler: Profiler):
+    """
+    Imports a log through a named pipe, written by another process while ``oc_declare`` parses it.
+
+    Export and import overlap, and the document never exists as a whole, neither on disk nor in memory.
+    The writer is a process rather than a thread because the native importer does not release the GIL.
+    It is not forked (see ``process_context``), but receives the log tables pickled.
+    """
+    context = process_context()
+    written = context.Value("q", 0)
+    with tempfile.TemporaryDirectory() as directory:
+        fifo = Path(directory) / "ocel.json"
+        os.mkfifo(fifo)
+        writer = context.Process(target=_stream_to_fifo, args=(log, fifo, written), daemon=True)
+        writer.start()
+        try:
+            with profiler.stage("stream") as stage:
+                processed = oc_declare.import_ocel2(str(fifo))
+                writer.join()
+                stage.update(nbytes=written.value, storage="pipe")
+        except BaseException:
+            # The writer may be blocked on a pipe nobody reads anymore
+            writer.terminate()
+            raise
+        finally:
+            writer.join()
+
+    if writer.exitcode != 0:
+        raise RuntimeError(f"Streaming the OCEL to oc_declare failed (exit code {writer.exitcode})")
+    return processed, written.value
+
+
+def import_ocel(log: LogTables, profiler: Profiler | None = None):
+    """
+    Imports a log into ``oc_declare``.
+
+    Returns the pre-processed log together with the size of the handoff document in bytes. With
+    ``settings.handoff_mode`` set to ``"stream"`` (and where named pipes are available), the
+    document is streamed to the importer instead of being written to a file first. Otherwise it is
+    written to memory or disk, depending on its estimated size, and deleted once it is imported.
+    """
+    profiler = profiler or Profiler()
+
+    if settings.handoff_mode == "stream" and hasattr(os, "mkfifo"):
+        return _import_streaming(log, profiler)
+
+    with handoff_file(log, profiler) as (json_path, nbytes):
+        with profiler.stage("import"):
+            return oc_declare.import_ocel2(str(json_path)), nbytes
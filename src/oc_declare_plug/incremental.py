@@ -0,0 +1,387 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+
+import numpy as np
+import oc_declare
+import pandas as pd
+from oc_declare import OCDeclareArc
+from ocelescope import OCEL
+
+from .cache import load_processed
+from .components import ObjectComponents
+from .config import settings
+from .conformance import Counts, constraint_to_arc, count_satisfied
+from .constraint_set import map_ocdeclarearcs_to_constraints
+from .constraints import Constraint, ConstraintKey, O2OMode, arc_key
+from .handoff import (
+    ACTIVITY,
+    EVENT_ID,
+    OBJECT_ID,
+    OBJECT_TYPE,
+    QUALIFIER,
+    TARGET_OBJECT_ID,
+    TIMESTAMP,
+    LogTables,
+    import_ocel,
+)
+from .partition import with_weaker_variants, without_implied
+from .profiling import Profiler
+
+
+def _new_rows(frame: pd.DataFrame, previous: pd.DataFrame, columns: list[str]) -> pd.Series:
+    return ~pd.MultiIndex.from_frame(frame[columns]).isin(pd.MultiIndex.from_frame(previous[columns]))
+
+
+def prefix_fingerprint(log: LogTables, event_ids: pd.Series, object_ids: pd.Series) -> str:
+    """
+    Returns a content fingerprint of the part of ``log`` made up of the given events and objects.
+
+    It covers the activities and times of the events, all of their E2O relationships, the types of
+    the objects and the O2O relationships among them, regardless of row order.
+    """
+    events = log.events[log.events[EVENT_ID].isin(event_ids)]
+    objects = log.objects[log.objects[OBJECT_ID].isin(object_ids)]
+    o2o = log.o2o[log.o2o[OBJECT_ID].isin(object_ids) & log.o2o[TARGET_OBJECT_ID].isin(object_ids)]
+    parts = (
+        (events, [EVENT_ID, ACTIVITY, TIMESTAMP]),
+        (log.relations[log.relations[EVENT_ID].isin(event_ids)], [EVENT_ID, OBJECT_ID, QUALIFIER]),
+        (objects, [OBJECT_ID, OBJECT_TYPE]),
+        (o2o, [OBJECT_ID, TARGET_OBJECT_ID, QUALIFIER]),
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    for frame, columns in parts:
+        hashes = np.sort(pd.util.hash_pandas_object(frame[columns], index=False).to_numpy())
+        digest.update(len(hashes).to_bytes(8, "little"))
+        digest.update(hashes.tobytes())
+    return digest.hexdigest()
+
+
+class IncrementalState:
+    """
+    A log that grows by appended events, split into object components (see ``ObjectComponents``).
+
+    Whether a source event satisfies a constraint only depends on the events of its component, so
+    when events are appended, only the components they touch can change. ``advance`` returns those
+    components before and after the update as two sub-logs, and ``apply`` replaces the counts of
+    the former by the counts of the latter.
+    """
+
+    def __init__(self, acts_to_use: list[str] | None = None):
+        self.acts_to_use = acts_to_use or None
+        self.log: LogTables | None = None
+        # Content fingerprint of self.log when it was evaluated (see prefix_fingerprint)
+        self.fingerprint: str | None = None
+        self.components: ObjectComponents | None = None
+        self.counts: dict[ConstraintKey, Counts] = {}
+        self.appended = 0
+        self.lock = Lock()
+
+    def is_extended_by(self, log: LogTables) -> bool:
+        """
+        Whether ``log`` only appends to the previous log: it contains every event and object of the
+        previous log unchanged, with the same E2O relationships, and the same O2O relationships among
+        those objects.
+        """
+        if self.log is None:
+            return False
+        event_ids, object_ids = self.log.events[EVENT_ID], self.log.objects[OBJECT_ID]
+        if int(log.events[EVENT_ID].isin(event_ids).sum()) != len(event_ids):
+            return False
+        return prefix_fingerprint(log, event_ids, object_ids) == self.fingerprint
+
+    def _remember(self, log: LogTables):
+        self.log = log
+        self.fingerprint = prefix_fingerprint(log, log.events[EVENT_ID], log.objects[OBJECT_ID])
+
+    def needs_refresh(self, log: LogTables) -> bool:
+        """
+        Whether ``log`` has to be evaluated from scratch: it is the first log of the lineage, it is not
+        an extension of the previous one (see ``is_extended_by``), or the events appended since the
+        last full evaluation exceed ``settings.incremental_refresh_fraction`` of it.
+        """
+        if not self.is_extended_by(log):
+            return True
+        appended = self.appended + len(log.events) - len(self.log.events)
+        return appended > settings.incremental_refresh_fraction * len(log.events)
+
+    def reset(self, log: LogTables, profiler: Profiler):
+        with profiler.stage("components"):
+            self.components = ObjectComponents.from_log(log)
+        self._remember(log)
+        self.appended = 0
+
+    def advance(self, log: LogTables, profiler: Profiler) -> tuple[LogTables, LogTables] | None:
+        """
+        Moves on to ``log``, returning the sub-logs of the components it changes, before and after.
+
+        Returns ``None`` if ``log`` appends neither events nor O2O relationships.
+        """
+        previous = self.log
+        new_events = ~log.events[EVENT_ID].isin(previous.events[EVENT_ID])
+        new_o2o = _new_rows(log.o2o, previous.o2o, [OBJECT_ID, TARGET_OBJECT_ID, QUALIFIER])
+        self._remember(log)
+        if not new_events.any() and not new_o2o.any():
+            return None
+
+        with profiler.stage("components"):
+            delta = LogTables(
+                log.events[new_events.to_numpy()],
+                log.objects,
+                log.relations[log.relations[EVENT_ID].isin(log.events[EVENT_ID][new_events.to_numpy()])],
+                log.o2o[new_o2o],
+            )
+            touched = self.components.update(delta)
+            before = previous.with_events(self.components.event_mask(previous, touched))
+            after = log.with_events(self.components.event_mask(log, touched) | new_events)
+        self.appended += int(new_events.sum())
+        return before, after
+
+    def count_regions(
+        self, before: LogTables, after: LogTables, arcs: list[OCDeclareArc], profiler: Profiler, processed_after=None
+    ) -> tuple[list[Counts | None], list[Counts | None]]:
+        """Counts the satisfied source events of each arc on the sub-logs returned by ``advance``."""
+        removed: list[Counts | None] = [(0, 0)] * len(arcs)
+        if not before.events.empty:
+            processed_before, _ = import_ocel(before, profiler)
+            with profiler.stage("conformance"):
+                removed = count_satisfied(processed_before, before.events, arcs)
+        if processed_after is None:
+            processed_after, _ = import_ocel(after, profiler)
+        with profiler.stage("conformance"):
+            added = count_satisfied(processed_after, after.events, arcs)
+        return removed, added
+
+    def apply(self, keys: list[ConstraintKey], removed: list[Counts | None], added: list[Counts | None]):
+        for key, old, new in zip(keys, removed, added, strict=True):
+            if old is None or new is None:
+                # The arc could not be checked on one of the sub-logs; its counts are unknown from now on
+                self.counts.pop(key, None)
+                continue
+            satisfied, total = self.counts[key]
+            self.counts[key] = (satisfied - old[0] + new[0], total - old[1] + new[1])
+
+    def conformance(self, key: ConstraintKey) -> float | None:
+        counts = self.counts.get(key)
+        if counts is None or not counts[1]:
+            return None
+        return counts[0] / counts[1]
+
+
+class IncrementalDiscovery(IncrementalState):
+    """
+    Discovery statistics of a growing log, updated in time proportional to the appended events.
+
+    A full discovery keeps the discovered constraints together with a pool of candidates discovered
+    at the looser threshold ``threshold + settings.incremental_slack``, and the number of source
+    events satisfying each candidate. ``oc_declare`` does not report arcs implied by a stronger arc
+    type that holds, so the weaker variants of all of them are candidates too (see
+    ``with_weaker_variants``), and the result includes the weaker variants that hold. On every update
+    the counts of the changed components are replaced, and candidates that cross the threshold enter
+    or leave the result. Arcs implied by another arc of the result are left out of the returned
+    constraints, as in ``oc_declare``. The result therefore stays the native result of the last full
+    discovery plus the candidates that crossed the threshold since. Arcs outside of the pool are only
+    picked up if their source activity is new.
+    """
+
+    def __init__(self, threshold: float, o2o_mode: O2OMode, acts_to_use: list[str] | None = None):
+        super().__init__(acts_to_use)
+        self.threshold = threshold
+        self.o2o_mode = o2o_mode
+        self.candidates: dict[ConstraintKey, OCDeclareArc] = {}
+        self.result: list[ConstraintKey] = []
+
+    @property
+    def pool_threshold(self) -> float:
+        return min(1.0, self.threshold + settings.incremental_slack)
+
+    def _conforms(self, key: ConstraintKey) -> bool:
+        score = self.conformance(key)
+        return score is not None and score >= 1 - self.threshold
+
+    def _discover(self, processed, threshold: float, occurring: set[str] | None = None) -> list[OCDeclareArc]:
+        # oc_declare fails on activities to use that do not occur in the log, as in a region of a few events
+        acts_to_use = self.acts_to_use
+        if acts_to_use and occurring is not None:
+            acts_to_use = [activity for activity in acts_to_use if activity in occurring]
+            if not acts_to_use:
+                return []
+        return oc_declare.discover(processed, threshold, acts_to_use=acts_to_use, o2o_mode=self.o2o_mode)
+
+    def rediscover(self, log: LogTables, processed, profiler: Profiler):
+        """Discovers everything from scratch on a (pre-processed) log."""
+        with profiler.stage("discover"):
+            discovered = self._discover(processed, self.threshold)
+            object_types = set(log.objects[OBJECT_TYPE].unique())
+            pool = with_weaker_variants([*discovered, *self._discover(processed, self.pool_threshold)], object_types)
+            self.candidates = {arc_key(arc): arc for arc in pool}
+        with profiler.stage("conformance"):
+            counts = count_satisfied(processed, log.events, list(self.candidates.values()))
+        self.counts = {key: c for key, c in zip(self.candidates, counts, strict=True) if c is not None}
+        native = {arc_key(arc) for arc in discovered}
+        implied = {arc_key(arc) for arc in with_weaker_variants(discovered, object_types)}
+        self.result = [key for key in self.candidates if key in native or (key in implied and self._conforms(key))]
+        self.reset(log, profiler)
+
+    def update(self, log: LogTables, profiler: Profiler):
+        """Applies the events and objects that ``log`` appends to the previous log."""
+        known_activities = set(self.log.events[ACTIVITY].unique())
+        regions = self.advance(log, profiler)
+        if regions is None:
+            return
+        before, after = regions
+        processed_after, _ = import_ocel(after, profiler)
+
+        with profiler.stage("discover"):
+            # Arcs from new source activities are exact: all of their source events are in the region
+            occurring = set(after.events[ACTIVITY].unique())
+            discovered = self._discover(processed_after, self.pool_threshold, occurring)
+            for arc in with_weaker_variants(discovered, set(after.objects[OBJECT_TYPE].unique())):
+                key = arc_key(arc)
+                if key not in self.candidates and arc.from_activity not in known_activities:
+                    self.candidates[key] = arc
+                    self.counts[key] = (0, 0)
+
+        keys = [key for key in self.candidates if key in self.counts]
+        arcs = [self.candidates[key] for key in keys]
+        conformed = {key for key in keys if self._conforms(key)}
+        self.apply(keys, *self.count_regions(before, after, arcs, profiler, processed_after))
+
+        result = set(self.result)
+        for key in keys:
+            if key in conformed and not self._conforms(key):
+                result.discard(key)
+            elif key not in conformed and self._conforms(key):
+                result.add(key)
+        self.result = [key for key in self.candidates if key in result]
+
+    def discover(self, ocel: OCEL, profiler: Profiler) -> list[Constraint]:
+        log = LogTables.from_ocel(ocel)
+        if self.needs_refresh(log):
+            self.rediscover(log, load_processed(ocel, profiler=profiler), profiler)
+        else:
+            self.update(log, profiler)
+
+        keys = [key for key, keep in zip(self.result, without_implied(self.result), strict=True) if keep]
+        with profiler.stage("map"):
+            constraints = map_ocdeclarearcs_to_constraints(self.candidates[key] for key in keys)
+            for key, c in zip(keys, constraints, strict=True):
+                score = self.conformance(key)
+                c.conformance = None if score is None else round(score, 3)
+                c.o2o_mode = self.o2o_mode
+        return constraints
+
+
+class IncrementalConformance(IncrementalState):
+    """
+    Conformance counts of the constraints last checked against a growing log.
+
+    Constraints checked before are updated on the components changed by appended events only;
+    constraints seen for the first time are checked on the whole log. Counts of constraints that
+    are no longer checked are dropped.
+    """
+
+    def check(self, ocel: OCEL, constraints: list[Constraint], profiler: Profiler) -> list[float | None]:
+        log = LogTables.from_ocel(ocel)
+        if self.needs_refresh(log):
+            self.counts = {}
+            self.reset(log, profiler)
+            regions = None
+        else:
+            regions = self.advance(log, profiler)
+
+        arcs: dict[ConstraintKey, OCDeclareArc] = {}
+        for c in constraints:
+            key = c.key()
+            if key in arcs:
+                continue
+            try:
+                arcs[key] = constraint_to_arc(c)
+            except Exception as e:
+                print(f"⚠️ Failed to check conformance for {c.source} → {c.target}: {e}")
+        self.counts = {key: counts for key, counts in self.counts.items() if key in arcs}
+
+        tracked = [key for key in arcs if key in self.counts]
+        if regions is not None and tracked:
+            self.apply(tracked, *self.count_regions(*regions, [arcs[key] for key in tracked], profiler))
+
+        fresh = [key for key in arcs if key not in self.counts]
+        if fresh:
+            processed = load_processed(ocel, profiler=profiler)
+            with profiler.stage("conformance"):
+                counts = count_satisfied(processed, log.events, [arcs[key] for key in fresh])
+            self.counts.update((key, c) for key, c in zip(fresh, counts, strict=True) if c is not None)
+
+        scores = {key: self.conformance(key) for key in arcs}
+        return [None if scores.get(c.key()) is None else round(scores[c.key()], 3) for c in constraints]
+
+
+# Lineage key -> incremental state, least recently used first
+_states: OrderedDict[Hashable, IncrementalState] = OrderedDict()
+_states_lock = Lock()
+
+
+def lineage_key(ocel: OCEL, *parameters: Hashable) -> Hashable:
+    """
+    Identifies the successive versions of a log, evaluated with the same parameters.
+
+    Logs are only told apart by name here; whether a log really extends the previous log of its
+    lineage is decided on content (see ``IncrementalState.is_extended_by``).
+    """
+    source = (ocel.meta or {}).get("fileName") or ocel.id
+    return (source, *parameters)
+
+
+def _state(key: Hashable, factory: Callable[[], IncrementalState]) -> IncrementalState:
+    # Keeps the states of the last settings.incremental_max_states lineages
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = factory()
+        _states.move_to_end(key)
+        while len(_states) > settings.incremental_max_states:
+            _states.popitem(last=False)
+    return state
+
+
+def discover_incremental(
+    ocel: OCEL,
+    threshold: float,
+    o2o_mode: O2OMode,
+    acts_to_use: list[str] | None = None,
+    check_conformance: bool = False,
+    profiler: Profiler | None = None,
+) -> list[Constraint]:
+    """
+    Discovers constraints on a log that may extend a log discovered before, reusing the statistics
+    of the previous run (see ``IncrementalDiscovery``).
+    """
+    profiler = profiler or Profiler()
+    acts = tuple(sorted(set(acts_to_use or [])))
+    state = _state(
+        lineage_key(ocel, "discover", threshold, o2o_mode, acts),
+        lambda: IncrementalDiscovery(threshold, o2o_mode, acts_to_use),
+    )
+
+    with state.lock:
+        constraints = state.discover(ocel, profiler)
+    if not check_conformance:
+        for c in constraints:
+            c.conformance = None
+    return constraints
+
+
+def check_incremental(
+    ocel: OCEL, constraints: list[Constraint], profiler: Profiler | None = None
+) -> list[float | None]:
+    """
+    Checks the conformance of constraints against a log that may extend a log checked before, only
+    re-evaluating the components changed by appended events (see ``IncrementalConformance``).
+
+    Returns the rounded conformance per input constraint, in input order.
+    """
+    profiler = profiler or Profiler()
+    state = _state(lineage_key(ocel, "conformance"), IncrementalConformance)
+    with state.lock:
+        return state.check(ocel, constraints, profiler)
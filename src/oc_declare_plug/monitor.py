@@ -0,0 +1,272 @@
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from itertools import count
+from typing import NamedTuple
+
+import pandas as pd
+from pydantic import BaseModel
+
+from .constraints import Constraint, Constraints
+from .handoff import ACTIVITY, EVENT_ID, OBJECT_ID, OBJECT_TYPE, TIMESTAMP
+
+# Arc types whose source events wait for later events, or look back at earlier ones
+_FUTURE = {"EF", "AS", "DF"}
+_PAST = {"EP", "AS", "DP"}
+
+
+class MonitorEvent(NamedTuple):
+    id: str
+    activity: str
+    time: datetime
+    objects: Mapping[str, str]  # object id -> object type
+
+
+class Violation(BaseModel):
+    constraint: Constraint
+    event_id: str
+    reason: str
+
+
+class _Record(NamedTuple):
+    id: str
+    activity: str
+    time: datetime
+    objects: frozenset[str]
+    position: int  # in the feed
+
+
+class _ObjectState:
+    __slots__ = ("history", "pending")
+
+    def __init__(self, history: int):
+        self.history: deque[_Record] = deque(maxlen=history)
+        self.pending: set[int] = set()
+
+
+class _Obligation:
+    """The target events a source event still waits for, counted per EACH object (or once)."""
+
+    __slots__ = ("constraint", "source", "any_sets", "all_sets", "each", "per_object", "watched", "counts", "waiting")
+
+    def __init__(self, constraint: int, source: _Record, types: Mapping[str, str], c: Constraint):
+        self.constraint = constraint
+        self.source = source
+        objects_of = {}
+        for oid, otype in types.items():
+            objects_of.setdefault(otype, set()).add(oid)
+        self.any_sets = [objects_of.get(otype, set()) for otype in c.any_objects]
+        self.all_sets = [objects_of.get(otype, set()) for otype in c.all_objects]
+        self.each = sorted(oid for otype in c.each_objects for oid in objects_of.get(otype, ()))
+        # With EACH object types, a source event without such objects demands nothing
+        self.per_object = bool(c.each_objects)
+        self.counts = [0] * len(self.each) if self.per_object else [0]
+        self.watched = set().union(*self.any_sets, *self.all_sets, self.each)
+        # Directly-follows obligations wait for the next related event of every count
+        self.waiting = set(range(len(self.counts))) if c.type == "DF" else set()
+
+    def related(self, event: _Record) -> list[int]:
+        """Returns the counts an event is related to: it shares the objects demanded by the constraint."""
+        objects = event.objects
+        if not all(s & objects for s in self.any_sets) or not all(s <= objects for s in self.all_sets):
+            return []
+        if not self.per_object:
+            return [0]
+        return [i for i, oid in enumerate(self.each) if oid in objects]
+
+    def add(self, target: _Record, counts: Iterable[int] | None = None):
+        """Counts a target event for the given counts (all counts it is related to by default)."""
+        for i in self.related(target) if counts is None else counts:
+            self.counts[i] += 1
+
+
+class ConformanceMonitor:
+    """
+    Checks OC-DECLARE constraints online, on a feed of events in time order.
+
+    The monitor re-implements the OC-DECLARE semantics that ``oc_declare`` checks on whole logs:
+    every source event demands between ``min`` and ``max`` target events (before it, after it,
+    directly before or after it, or at any time, depending on the arc type) that share the objects
+    of its ANY and ALL object types, counted separately for every object of its EACH object types.
+    A target event directly follows (or precedes) a source event if no event in between shares
+    these objects.
+
+    Source events looking back (EP, DP) are decided on arrival, using the last ``history`` events of
+    each object. Source events looking ahead (EF, DF, AS) stay pending until they are decided: once
+    ``max`` is exceeded, once ``min`` is reached without an upper bound, once every count had its
+    next related event (DF), when more than ``max_pending`` source events are pending, or on
+    ``flush``. State is kept for the ``max_objects`` most recently seen objects only, so later
+    events of forgotten objects are not matched against earlier ones anymore.
+
+    Every constraint needs at least one ANY, ALL or EACH object type, which relates its target
+    events to its source events; constraints without any are rejected with a ``ValueError``.
+    """
+
+    def __init__(
+        self,
+        constraints: Constraints | Iterable[Constraint],
+        history: int = 64,
+        max_objects: int = 100_000,
+        max_pending: int = 100_000,
+    ):
+        self.constraints = list(constraints.constraints if isinstance(constraints, Constraints) else constraints)
+        for c in self.constraints:
+            if not (c.any_objects or c.all_objects or c.each_objects):
+                raise ValueError(f"Constraint {c.type}({c.source}, {c.target}) has no object types to monitor")
+        self.history = history
+        self.max_objects = max_objects
+        self.max_pending = max_pending
+        self.satisfied = [0] * len(self.constraints)
+        self.violated = [0] * len(self.constraints)
+        self._by_source: dict[str, list[int]] = {}
+        for i, c in enumerate(self.constraints):
+            self._by_source.setdefault(c.source, []).append(i)
+        self._objects: OrderedDict[str, _ObjectState] = OrderedDict()
+        self._pending: OrderedDict[int, _Obligation] = OrderedDict()
+        self._ids = count()
+        self._positions = count()
+
+    def feed(self, event: MonitorEvent) -> list[Violation]:
+        """Processes the next event of the feed, returning the violations it decided."""
+        record = _Record(event.id, event.activity, event.time, frozenset(event.objects), next(self._positions))
+        violations: list[Violation] = []
+
+        affected = {key for oid in record.objects if oid in self._objects for key in self._objects[oid].pending}
+        for key in sorted(affected):
+            obligation = self._pending[key]
+            c = self.constraints[obligation.constraint]
+            if c.type == "DF":
+                next_of = obligation.waiting.intersection(obligation.related(record))
+                obligation.waiting -= next_of
+                if record.activity == c.target:
+                    obligation.add(record, next_of)
+            elif record.activity == c.target and (c.type == "AS" or record.time > obligation.source.time):
+                obligation.add(record)
+            self._decide(key, violations)
+
+        for i in self._by_source.get(record.activity, []):
+            self._open(i, record, event.objects, violations)
+
+        for oid in record.objects:
+            state = self._objects.get(oid)
+            if state is None:
+                state = self._objects[oid] = _ObjectState(self.history)
+            else:
+                self._objects.move_to_end(oid)
+            state.history.append(record)
+        while len(self._objects) > self.max_objects:
+            self._objects.popitem(last=False)
+        return violations
+
+    def feed_many(self, events: Iterable[MonitorEvent]) -> list[Violation]:
+        """Processes a micro-batch of events, in order."""
+        return [violation for event in events for violation in self.feed(event)]
+
+    def feed_relations(self, relations: pd.DataFrame) -> list[Violation]:
+        """Processes a micro-batch of events given as OCEL E2O relations, in the order of their timestamps."""
+        relations = relations.sort_values(TIMESTAMP, kind="stable")
+        events = (
+            MonitorEvent(
+                eid,
+                group[ACTIVITY].iat[0],
+                group[TIMESTAMP].iat[0],
+                dict(zip(group[OBJECT_ID], group[OBJECT_TYPE], strict=True)),
+            )
+            for eid, group in relations.groupby(EVENT_ID, sort=False)
+        )
+        return self.feed_many(events)
+
+    def flush(self) -> list[Violation]:
+        """Decides every pending source event as if the feed ended here."""
+        violations: list[Violation] = []
+        for key in list(self._pending):
+            self._decide(key, violations, final=True)
+        return violations
+
+    def scores(self) -> list[float | None]:
+        """Running conformance per constraint: the share of decided source events that satisfied it."""
+        return [
+            round(satisfied / (satisfied + violated), 3) if satisfied + violated else None
+            for satisfied, violated in zip(self.satisfied, self.violated, strict=True)
+        ]
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def to_constraints(self) -> Constraints:
+        """Returns the monitored constraints with their running conformance."""
+        return Constraints(
+            constraints=[
+                c.model_copy(update={"conformance": score})
+                for c, score in zip(self.constraints, self.scores(), strict=True)
+            ]
+        )
+
+    def _open(self, i: int, source: _Record, types: Mapping[str, str], violations: list[Violation]):
+        c = self.constraints[i]
+        obligation = _Obligation(i, source, types, c)
+
+        if c.type in _PAST:
+            earlier = {
+                record.position: record
+                for oid in obligation.watched
+                if (state := self._objects.get(oid)) is not None
+                for record in state.history
+            }
+            if c.type == "DP":
+                # The directly-preceding event of a count is the last earlier event related to it
+                previous: dict[int, _Record] = {}
+                for position in sorted(earlier):
+                    for counter in obligation.related(earlier[position]):
+                        previous[counter] = earlier[position]
+                for counter, record in previous.items():
+                    if record.activity == c.target:
+                        obligation.add(record, [counter])
+            else:
+                for record in earlier.values():
+                    if record.activity == c.target and (c.type == "AS" or record.time < source.time):
+                        obligation.add(record)
+
+        if c.type == "AS" and c.target == source.activity:
+            # A source event of its own activity is one of its targets
+            obligation.add(source)
+
+        key = next(self._ids)
+        self._pending[key] = obligation
+        if c.type in _FUTURE:
+            for oid in obligation.watched:
+                state = self._objects.get(oid)
+                if state is None:
+                    state = self._objects[oid] = _ObjectState(self.history)
+                state.pending.add(key)
+        self._decide(key, violations, final=c.type not in _FUTURE)
+        while len(self._pending) > self.max_pending:
+            self._decide(next(iter(self._pending)), violations, final=True)
+
+    def _decide(self, key: int, violations: list[Violation], final: bool = False):
+        obligation = self._pending[key]
+        c = self.constraints[obligation.constraint]
+        low = c.min or 0
+        too_few = any(n < low for n in obligation.counts)
+        too_many = c.max is not None and any(n > c.max for n in obligation.counts)
+        if c.type == "DF" and not obligation.waiting:
+            final = True
+        elif c.max is None and not too_few:
+            final = True
+        if not (final or too_many):
+            return
+
+        del self._pending[key]
+        for oid in obligation.watched:
+            state = self._objects.get(oid)
+            if state is not None:
+                state.pending.discard(key)
+        if too_few or too_many:
+            self.violated[obligation.constraint] += 1
+            reason = f"more than {c.max}" if too_many else f"fewer than {low}"
+            violations.append(
+                Violation(constraint=c, event_id=obligation.source.id, reason=f"{reason} {c.target} events")
+            )
+        else:
+            self.satisfied[obligation.constraint] += 1
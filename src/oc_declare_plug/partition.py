@@ -0,0 +1,276 @@
+import heapq
+import time
+from collections.abc import Collection
+from multiprocessing.connection import Connection
+
+import numpy as np
+import oc_declare
+from oc_declare import OCDeclareArc
+from ocelescope import OCEL
+
+from .components import ObjectComponents
+from .config import settings
+from .conformance import Counts, arc_spec, constraint_to_arc, count_satisfied, spec_arc
+from .constraint_set import map_ocdeclarearcs_to_constraints
+from .constraints import Constraint, ConstraintKey, O2OMode, arc_key
+from .handoff import ACTIVITY, EVENT_ID, OBJECT_ID, LogTables, import_ocel, process_context
+from .profiling import Profiler
+
+# Arc types implied by each arc type; ``oc_declare`` does not report an arc whose stronger variant holds
+_WEAKER = {"DF": ("EF", "AS"), "DP": ("EP", "AS"), "EF": ("AS",), "EP": ("AS",), "AS": ()}
+_STRONGER = {weak: tuple(t for t, weaker in _WEAKER.items() if weak in weaker) for weak in _WEAKER}
+
+
+def partition_log(log: LogTables, shards: int) -> list[LogTables]:
+    """
+    Splits a log into at most ``shards`` sub-logs along its object components (see ``ObjectComponents``).
+
+    Components are assigned largest first to the shard with the fewest events so far, so shards are
+    balanced by events. Every source event ends up in the same shard as all events that can satisfy
+    it, so counts of satisfied source events can be summed over the shards.
+    """
+    components = ObjectComponents.from_log(log)
+    relations = log.relations[[EVENT_ID, OBJECT_ID]]
+    event_components = (
+        relations.assign(component=components.labels.reindex(relations[OBJECT_ID]).to_numpy())
+        .drop_duplicates(EVENT_ID)
+        .groupby("component")
+        .size()
+        .sort_values(ascending=False, kind="stable")
+    )
+
+    loads = [(0, shard) for shard in range(shards)]
+    assigned: list[list] = [[] for _ in range(shards)]
+    for component, size in event_components.items():
+        load, shard = heapq.heappop(loads)
+        assigned[shard].append(component)
+        heapq.heappush(loads, (load + int(size), shard))
+
+    masks = [components.event_mask(log, np.array(labels)) for labels in assigned if labels]
+    if not masks:
+        return [log]
+    # Events without objects do not belong to any component, they go to the first shard
+    masks[0] = masks[0] | ~log.events[EVENT_ID].isin(relations[EVENT_ID])
+    return [log.with_events(mask) for mask in masks]
+
+
+def with_weaker_variants(arcs: list[OCDeclareArc], object_types: Collection[str] | None = None) -> list[OCDeclareArc]:
+    """
+    Returns the distinct arcs, together with the variants of weaker arc types with the same bindings.
+
+    Variants are built from the fields of an arc, which cannot express bindings through O2O
+    relationships (as in ``order>item``). Given the ``object_types`` of the log, arcs bound to
+    anything else get no variants.
+    """
+    variants: dict[ConstraintKey, OCDeclareArc] = {}
+    for arc in arcs:
+        variants.setdefault(arc_key(arc), arc)
+        spec = arc_spec(arc)
+        if object_types is not None and not set(spec[5] + spec[6] + spec[7]).issubset(object_types):
+            continue
+        for arc_type in _WEAKER[spec[2]]:
+            variant = spec_arc((*spec[:2], arc_type, *spec[3:]))
+            variants.setdefault(arc_key(variant), variant)
+    return list(variants.values())
+
+
+def without_implied(keys: list[ConstraintKey]) -> list[bool]:
+    """Returns for each key whether it is kept, i.e. no stronger arc type with the same bindings is among ``keys``."""
+    present = set(keys)
+    return [not any((stronger, *key[1:]) in present for stronger in _STRONGER[key[0]]) for key in keys]
+
+
+def _serve(shard: LogTables, conn: Connection):
+    try:
+        processed, _ = import_ocel(shard)
+        occurring = set(shard.events[ACTIVITY].unique())
+        conn.send(("ready", None))
+        while (message := conn.recv()) is not None:
+            command, *args = message
+            if command == "discover":
+                threshold, acts_to_use, o2o_mode = args
+                if acts_to_use:
+                    # oc_declare fails on activities to use that do not occur in the log, as in a shard
+                    acts_to_use = [activity for activity in acts_to_use if activity in occurring]
+                arcs = []
+                if acts_to_use is None or acts_to_use:
+                    arcs = oc_declare.discover(processed, threshold, acts_to_use=acts_to_use, o2o_mode=o2o_mode)
+                conn.send(("ok", [arc_spec(arc) for arc in arcs]))
+            elif command == "count":
+                conn.send(("ok", count_satisfied(processed, shard.events, [spec_arc(spec) for spec in args[0]])))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class PartitionedLog:
+    """
+    A log split into shards, each imported and served by its own worker process.
+
+    Workers are started on construction (see ``process_context``), receive their shard and import it
+    in parallel; ``discover`` and ``count`` broadcast a request to all workers and merge their
+    answers. A worker that dies, or does not answer within ``timeout`` seconds, fails the request.
+    Use it as a context manager, so the workers are shut down afterwards.
+    """
+
+    def __init__(self, log: LogTables, workers: int, profiler: Profiler | None = None, timeout: float | None = None):
+        profiler = profiler or Profiler()
+        self.timeout = settings.partition_timeout if timeout is None else timeout
+        with profiler.stage("partition"):
+            self.shards = partition_log(log, workers)
+
+        context = process_context()
+        self._connections: list[Connection] = []
+        self._workers = []
+        with profiler.stage("import"):
+            for shard in self.shards:
+                parent, child = context.Pipe()
+                worker = context.Process(target=_serve, args=(shard, child), daemon=True)
+                worker.start()
+                child.close()
+                self._connections.append(parent)
+                self._workers.append(worker)
+            self._gather()
+
+    def _receive(self, conn: Connection, worker, deadline: float):
+        while not conn.poll(1.0):
+            if not worker.is_alive() and not conn.poll():
+                return "error", f"worker exited unexpectedly with code {worker.exitcode}"
+            if time.monotonic() > deadline:
+                return "error", f"worker did not answer within {self.timeout} seconds"
+        try:
+            return conn.recv()
+        except (EOFError, OSError):
+            return "error", "worker exited unexpectedly"
+
+    def _gather(self) -> list:
+        deadline = time.monotonic() + self.timeout
+        results = []
+        for conn, worker in zip(self._connections, self._workers, strict=True):
+            status, result = self._receive(conn, worker, deadline)
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"Partitioned oc_declare worker failed: {result}")
+            results.append(result)
+        return results
+
+    def _broadcast(self, *message) -> list:
+        for conn in self._connections:
+            try:
+                conn.send(message)
+            except OSError as e:
+                self.close()
+                raise RuntimeError(f"Partitioned oc_declare worker failed: worker exited unexpectedly ({e})") from e
+        return self._gather()
+
+    def discover(self, threshold: float, acts_to_use: list[str] | None, o2o_mode: O2OMode) -> list[OCDeclareArc]:
+        """Returns the distinct arcs discovered on any shard."""
+        arcs: dict[ConstraintKey, OCDeclareArc] = {}
+        for specs in self._broadcast("discover", threshold, acts_to_use, o2o_mode):
+            for spec in specs:
+                arc = spec_arc(spec)
+                arcs.setdefault(arc_key(arc), arc)
+        return list(arcs.values())
+
+    def count(self, arcs: list[OCDeclareArc]) -> list[Counts | None]:
+        """Returns the satisfied and total source events of each arc, summed over all shards."""
+        merged: list[Counts | None] = [(0, 0)] * len(arcs)
+        for counts in self._broadcast("count", [arc_spec(arc) for arc in arcs]):
+            merged = [
+                None if total is None or part is None else (total[0] + part[0], total[1] + part[1])
+                for total, part in zip(merged, counts, strict=True)
+            ]
+        return merged
+
+    def close(self):
+        for conn, worker in zip(self._connections, self._workers, strict=True):
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+            worker.join(5.0)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+        self._connections, self._workers = [], []
+
+    def __enter__(self) -> "PartitionedLog":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def discover_partitioned(
+    ocel: OCEL,
+    threshold: float,
+    o2o_mode: O2OMode,
+    acts_to_use: list[str] | None,
+    workers: int,
+    check_conformance: bool = False,
+    profiler: Profiler | None = None,
+) -> list[Constraint]:
+    """
+    Discovers constraints on the shards of a log in parallel.
+
+    The arcs discovered on any shard and their weaker variants (which a shard does not report if a
+    stronger arc type holds on it) are counted on all shards. Those whose merged conformance meets
+    the threshold are returned with their exact conformance on the whole log, except for the ones
+    implied by another returned arc, as on the whole log.
+
+    The result is close to, but not always the same as discovery on the whole log: ``oc_declare``
+    picks the object types of a binding from the statistics of the log it discovers on. A shard may
+    settle on other object types for a pair of activities (e.g. ``ALL{order, item}`` rather than
+    ``ALL{order}``), and arcs that only hold with object types picked on the whole log can be missed.
+
+    Arcs are passed between processes by their fields, which cannot express the O2O bindings of
+    arcs discovered with another O2O mode than ``"None"``, so only that mode is supported.
+    """
+    if o2o_mode != "None":
+        raise ValueError(f"Partitioned discovery does not support the O2O mode {o2o_mode!r}")
+    profiler = profiler or Profiler()
+    with PartitionedLog(LogTables.from_ocel(ocel), workers, profiler) as partitioned:
+        with profiler.stage("discover"):
+            arcs = with_weaker_variants(partitioned.discover(threshold, acts_to_use, o2o_mode))
+        with profiler.stage("conformance"):
+            counts = partitioned.count(arcs)
+
+    met = [
+        (arc, satisfied / total)
+        for arc, (satisfied, total) in zip(arcs, (c or (0, 0) for c in counts), strict=True)
+        if total and satisfied / total >= 1 - threshold
+    ]
+    kept = [entry for entry, keep in zip(met, without_implied([arc_key(arc) for arc, _ in met]), strict=True) if keep]
+    constraints = map_ocdeclarearcs_to_constraints(arc for arc, _ in kept)
+    for c, (_, score) in zip(constraints, kept, strict=True):
+        c.conformance = round(score, 3) if check_conformance else None
+        c.o2o_mode = o2o_mode
+    return constraints
+
+
+def check_partitioned(
+    ocel: OCEL, constraints: list[Constraint], workers: int, profiler: Profiler | None = None
+) -> list[float | None]:
+    """
+    Checks the conformance of constraints on the shards of a log in parallel.
+
+    Returns the rounded conformance per input constraint, in input order.
+    """
+    profiler = profiler or Profiler()
+    arcs: dict[ConstraintKey, OCDeclareArc] = {}
+    for c in constraints:
+        key = c.key()
+        if key not in arcs:
+            try:
+                arcs[key] = constraint_to_arc(c)
+            except Exception as e:
+                print(f"⚠️ Failed to check conformance for {c.source} → {c.target}: {e}")
+
+    with PartitionedLog(LogTables.from_ocel(ocel), workers, profiler) as partitioned:
+        with profiler.stage("conformance"):
+            counts = dict(zip(arcs, partitioned.count(list(arcs.values())), strict=True))
+
+    scores = {key: round(c[0] / c[1], 3) if c is not None and c[1] else None for key, c in counts.items()}
+    return [scores.get(c.key()) for c in constraints]
@@ -1,88 +1,30 @@
-import shutil
-import tempfile
-from pathlib import Path
+from collections.abc import Callable
 from typing import Annotated, Literal
 
-import oc_declare
-from oc_declare import OCDeclareArc
 from ocelescope import (
     OCEL,
     OCEL_FIELD,
     OCELAnnotation,
     Plugin,
     PluginInput,
-    Resource,
-    Table,
-    TableColumn,
     plugin_method,
 )
 from pydantic import BaseModel, Field
 
-
-class Constraint(BaseModel):
-    type: Literal["AS", "EF", "EP", "DF", "DP"]
-    source: str
-    target: str
-    any_objects: list[str] = []
-    all_objects: list[str] = []
-    each_objects: list[str] = []
-    min: int | None
-    max: int | None
-    conformance: float | None = None
-
-
-def map_ocdeclarearc_to_constraint(arc: OCDeclareArc) -> Constraint:
-    return Constraint(
-        type=arc.arc_type_name,
-        source=arc.from_activity,
-        target=arc.to_activity,
-        any_objects=arc.any_ots,
-        all_objects=arc.all_ots,
-        each_objects=arc.each_ots,
-        min=arc.min_count,
-        max=arc.max_count,
-    )
-
-
-class Constraints(Resource):
-    label = "OC-DECLARE Constraints"
-    description = "A list of discovered OC-DECLARE constraints"
-
-    constraints: list[Constraint]
-
-    def visualize(self) -> Table:
-        columns = [
-            TableColumn(id="type", label="Type", sortable=True),
-            TableColumn(id="source", label="Source Activity", sortable=True),
-            TableColumn(id="target", label="Target Activity", sortable=True),
-            TableColumn(id="all", label="ALL"),
-            TableColumn(id="each", label="EACH"),
-            TableColumn(id="any", label="ANY"),
-            TableColumn(id="min", label="Min Count", data_type="number"),
-            TableColumn(id="max", label="Max Count", data_type="number"),
-        ]
-
-        # Add optional conformance column
-        if any(c.conformance is not None for c in self.constraints):
-            columns.append(TableColumn(id="conformance", label="Conformance", data_type="number"))
-
-        rows = []
-        for c in self.constraints:
-            row = {
-                "type": c.type,
-                "source": c.source,
-                "target": c.target,
-                "all": ", ".join(c.all_objects),
-                "any": ", ".join(c.any_objects),
-                "each": ", ".join(c.each_objects),
-                "min": c.min,
-                "max": c.max,
-            }
-            if c.conformance is not None:
-                row["conformance"] = c.conformance
-            rows.append(row)
-
-        return Table(columns=columns, rows=rows)
+from .cache import load_processed, ocel_fingerprint
+from .config import settings
+from .conformance import check_conformance_batch
+from .constraints import Constraint, Constraints, O2OMode
+from .discovery import discover_runs
+from .handoff import LogTables
+from .incremental import check_incremental, discover_incremental
+from .partition import check_partitioned, discover_partitioned
+from .profiling import Profiler
+from .result_cache import check_cached
+from .sampling import check_sampled, discover_sampled
+from .singleflight import single_flight
+from .topk import discover_top_k
+from .worker import WorkerUnavailable, worker_client
 
 
 class DiscoverInput(PluginInput):
@@ -100,6 +42,73 @@ class DiscoverInput(PluginInput):
     ] = "None"
 
     check_conformance: bool = False
+    incremental: bool = Field(
+        default=False,
+        title="Incremental",
+        description="Reuse the statistics of the previous run on this log and only re-evaluate appended events",
+    )
+    sample_fraction: float | None = Field(
+        default=None,
+        gt=0,
+        le=1,
+        title="Sample Fraction",
+        description="Discover approximately, on this share of the connected components of the object graph",
+    )
+    confirm_borderline: bool = Field(
+        default=False,
+        title="Confirm Borderline Constraints",
+        description="Check sampled constraints whose confidence interval contains the threshold on the full log",
+    )
+    top_k: int | None = Field(
+        default=None,
+        ge=1,
+        title="Top k",
+        description="Only discover the k constraints with the highest conformance",
+    )
+    top_k_per_type: bool = Field(
+        default=False,
+        title="Top k per Type",
+        description="Keep the k best constraints of every constraint type instead of k overall",
+    )
+
+
+class SweepInput(PluginInput):
+    thresholds: list[Annotated[float, Field(gt=0, le=1)]] = Field(
+        default=[0.1, 0.2, 0.3],
+        min_length=1,
+        title="Noise Thresholds",
+        description="Constraints are discovered once per threshold",
+    )
+    acts_to_use: list[str] = OCEL_FIELD(
+        field_type="event_type",
+        title="Acitvities to use",
+        ocel_id="ocel",
+    )
+    o2o_mode: Literal[
+        "None",
+        "Direct",
+        "Reversed",
+        "Bidirectional",
+    ] = "None"
+
+    check_conformance: bool = False
+
+
+class O2OModesInput(PluginInput):
+    threshold: float = Field(default=0.2, gt=0, le=1)
+    acts_to_use: list[str] = OCEL_FIELD(
+        field_type="event_type",
+        title="Acitvities to use",
+        ocel_id="ocel",
+    )
+    o2o_modes: list[O2OMode] = Field(
+        default=["None", "Direct", "Reversed", "Bidirectional"],
+        min_length=1,
+        title="O2O Modes",
+        description="Constraints are discovered once per O2O mode",
+    )
+
+    check_conformance: bool = False
 
 
 class ConstraintInput(BaseModel):
@@ -126,6 +135,37 @@ class CreateConstraintsInput(PluginInput):
     )
 
 
+class CheckInput(PluginInput):
+    delta: bool = Field(
+        default=False,
+        title="Delta Mode",
+        description="Reuse the counts of the previous check on this log and only re-evaluate appended events",
+    )
+    approximate: bool = Field(
+        default=False,
+        title="Approximate",
+        description="Estimate conformance on growing random samples of the log, stopping once it is precise enough",
+    )
+    cutoff: float | None = Field(
+        default=None,
+        ge=0,
+        le=1,
+        title="Cutoff",
+        description="Stop as soon as the conformance is known to be above or below this value",
+    )
+    precision: float = Field(
+        default=0.01,
+        gt=0,
+        le=0.5,
+        title="Precision",
+        description="Stop once the confidence interval of the conformance is at most this wide on either side",
+    )
+
+
+# Input of check_constraints for callers that do not pass one; the method never modifies it
+_DEFAULT_CHECK_INPUT = CheckInput()
+
+
 def check_conformance_for_constraints(processed, constraints_resource: Constraints) -> Constraints:
     """
     Updates a Constraints resource in-place with conformance scores for each constraint.
@@ -138,28 +178,38 @@ def check_conformance_for_constraints(processed, constraints_resource: Constrain
         A Constraints resource whose Constraint objects will be updated with conformance values.
     """
 
-    # 3️⃣ Iterate through all constraints and compute conformance
-    for c in constraints_resource.constraints:
-        try:
-            arc = oc_declare.OCDeclareArc(
-                c.source,
-                c.target,
-                c.type,
-                c.min,
-                c.max,
-                all_ots=c.all_objects,
-                each_ots=c.each_objects,
-                any_ots=c.any_objects,
-            )
+    scores = check_conformance_batch(processed, constraints_resource.constraints)
+    for c, score in zip(constraints_resource.constraints, scores, strict=True):
+        c.conformance = score  # ✅ write result into constraint
 
-            score = oc_declare.check_conformance(processed, arc)
-            c.conformance = round(score, 3)  # ✅ write result into constraint
+    return constraints_resource
 
-        except Exception as e:
-            print(f"⚠️ Failed to check conformance for {c.source} → {c.target}: {e}")
-            c.conformance = None
 
-    return constraints_resource
+def worker_tables(ocel: OCEL) -> LogTables | None:
+    """Returns the tables of the log if conformance is checked in worker processes, which import it themselves."""
+    return LogTables.from_ocel(ocel) if settings.conformance_executor == "process" else None
+
+
+def conformance_checker(ocel: OCEL, profiler: Profiler) -> Callable[[list[Constraint]], list[float | None]]:
+    """
+    Returns a function that checks constraints against the log.
+
+    Constraints are checked on the resident worker if one is configured and reachable, and in-process
+    otherwise, on the log projected to their activities (see ``load_processed``).
+    """
+
+    def check(constraints: list[Constraint]) -> list[float | None]:
+        if worker_client is not None:
+            try:
+                return worker_client.check(ocel, constraints, profiler)
+            except WorkerUnavailable as e:
+                print(f"⚠️ oc_declare worker unavailable, checking in-process: {e}")
+        activities = {activity for c in constraints for activity in (c.source, c.target)}
+        processed = load_processed(ocel, profiler=profiler, activities=activities)
+        with profiler.stage("conformance"):
+            return check_conformance_batch(processed, constraints, worker_tables(ocel))
+
+    return check
 
 
 class OcDeclare(Plugin):
@@ -168,33 +218,132 @@ class OcDeclare(Plugin):
     version = "0.1.1"
 
     @plugin_method(label="Discover Constraints", description="Discover Constraints")
+    @single_flight
     def discover_constraints(
         self,
         ocel: Annotated[OCEL, OCELAnnotation(label="Event Log")],
         input: DiscoverInput,
     ) -> Constraints:
-        with tempfile.NamedTemporaryFile(suffix=".jsonocel", delete=False) as tmp:
-            tmp_path = Path(tmp.name)
+        profiler = Profiler()
 
-        ocel.write_ocel(tmp_path, ".jsonocel")
-        json_path = tmp_path.with_suffix(".json")
+        if input.incremental:
+            constraints = discover_incremental(
+                ocel, input.threshold, input.o2o_mode, input.acts_to_use, input.check_conformance, profiler
+            )
+            return Constraints(constraints=constraints, metrics=profiler.metrics)
+
+        if input.sample_fraction is not None and input.sample_fraction < 1:
+            constraints = discover_sampled(
+                ocel,
+                input.threshold,
+                input.o2o_mode,
+                input.acts_to_use,
+                input.sample_fraction,
+                input.confirm_borderline,
+                profiler,
+            )
+            return Constraints(constraints=constraints, threshold=input.threshold, metrics=profiler.metrics)
+
+        if input.top_k is not None:
+            constraints = discover_top_k(
+                ocel,
+                input.threshold,
+                input.o2o_mode,
+                input.acts_to_use,
+                input.top_k,
+                input.top_k_per_type,
+                input.check_conformance,
+                profiler,
+            )
+            return Constraints(constraints=constraints, threshold=input.threshold, metrics=profiler.metrics)
+
+        if settings.partition_workers > 1 and input.o2o_mode == "None":
+            constraints = discover_partitioned(
+                ocel,
+                input.threshold,
+                input.o2o_mode,
+                input.acts_to_use,
+                settings.partition_workers,
+                input.check_conformance,
+                profiler,
+            )
+            return Constraints(constraints=constraints, metrics=profiler.metrics)
 
-        shutil.move(tmp_path, json_path)
+        if worker_client is not None:
+            try:
+                constraints = worker_client.discover(
+                    ocel, input.threshold, input.o2o_mode, input.acts_to_use, input.check_conformance, profiler
+                )
+                return Constraints(constraints=constraints, metrics=profiler.metrics)
+            except WorkerUnavailable as e:
+                print(f"⚠️ oc_declare worker unavailable, discovering in-process: {e}")
 
-        processed = oc_declare.import_ocel2(str(json_path))
+        processed = load_processed(ocel, profiler=profiler, activities=input.acts_to_use)
 
-        arcs = oc_declare.discover(processed, input.threshold, acts_to_use=input.acts_to_use, o2o_mode=input.o2o_mode)
+        run = (input.threshold, input.o2o_mode)
+        constraints = discover_runs(
+            processed, [run], input.acts_to_use, input.check_conformance, profiler, worker_tables(ocel)
+        )[run]
 
-        constraints = []
+        return Constraints(constraints=constraints, metrics=profiler.metrics)
 
-        for arc in arcs:
-            c = map_ocdeclarearc_to_constraint(arc)
-            if input.check_conformance:
-                score = oc_declare.check_conformance(processed, arc)
-                c.conformance = round(score, 3)
-            constraints.append(c)
+    @plugin_method(label="Sweep Thresholds", description="Discover Constraints for several noise thresholds at once")
+    def sweep_thresholds(
+        self,
+        ocel: Annotated[OCEL, OCELAnnotation(label="Event Log")],
+        input: SweepInput,
+    ) -> list[Constraints]:
+        """
+        Discover constraints for every threshold of the input, returning one Constraints resource per threshold.
 
-        return Constraints(constraints=constraints)
+        The log is imported once, and every distinct arc is mapped (and checked) once, no matter how many
+        thresholds discover it.
+        """
+        profiler = Profiler()
+
+        processed = load_processed(ocel, profiler=profiler, activities=input.acts_to_use)
+
+        results = discover_runs(
+            processed,
+            [(threshold, input.o2o_mode) for threshold in input.thresholds],
+            input.acts_to_use,
+            input.check_conformance,
+            profiler,
+            worker_tables(ocel),
+        )
+
+        return [
+            Constraints(
+                constraints=[c.model_copy() for c in results[(threshold, input.o2o_mode)]],
+                threshold=threshold,
+                metrics=profiler.metrics,
+            )
+            for threshold in input.thresholds
+        ]
+
+    @plugin_method(label="Compare O2O Modes", description="Discover Constraints for several O2O modes at once")
+    def discover_o2o_modes(
+        self,
+        ocel: Annotated[OCEL, OCELAnnotation(label="Event Log")],
+        input: O2OModesInput,
+    ) -> Constraints:
+        """
+        Discover constraints for every O2O mode of the input on one imported log.
+
+        Returns a single Constraints resource in which every constraint is tagged with the O2O mode it was
+        discovered with.
+        """
+        profiler = Profiler()
+
+        processed = load_processed(ocel, profiler=profiler, activities=input.acts_to_use)
+
+        runs = [(input.threshold, o2o_mode) for o2o_mode in dict.fromkeys(input.o2o_modes)]
+        results = discover_runs(
+            processed, runs, input.acts_to_use, input.check_conformance, profiler, worker_tables(ocel)
+        )
+
+        constraints = [c for run in runs for c in results[run]]
+        return Constraints(constraints=constraints, threshold=input.threshold, metrics=profiler.metrics)
 
     @plugin_method(label="Create Constraints", description="Manually define OC-DECLARE constraints")
     def create_constraints(
@@ -205,15 +354,7 @@ class OcDeclare(Plugin):
         """
         Create OC-DECLARE constraints manually from user input.
         """
-        with tempfile.NamedTemporaryFile(suffix=".jsonocel", delete=False) as tmp:
-            tmp_path = Path(tmp.name)
-
-        ocel.write_ocel(tmp_path, ".jsonocel")
-        json_path = tmp_path.with_suffix(".json")
-
-        shutil.move(tmp_path, json_path)
-
-        processed = oc_declare.import_ocel2(str(json_path))
+        profiler = Profiler()
 
         constraints = [
             Constraint(
@@ -228,28 +369,59 @@ class OcDeclare(Plugin):
             )
             for c in input.constraints
         ]
+        result = Constraints(constraints=constraints)
         if input.check_conformance:
-            return check_conformance_for_constraints(processed, Constraints(constraints=constraints))
+            scores = check_cached(ocel_fingerprint(ocel), constraints, conformance_checker(ocel, profiler), profiler)
+            for c, score in zip(constraints, scores, strict=True):
+                c.conformance = score
 
-        return Constraints(constraints=constraints)
+        result.metrics = profiler.metrics
+        return result
 
     @plugin_method(label="Check Constraints", description="Check conformance on constraints")
+    @single_flight
     def check_constraints(
         self,
         ocel: Annotated[OCEL, OCELAnnotation(label="Event Log")],
         constraints: Constraints,
+        input: CheckInput = _DEFAULT_CHECK_INPUT,
     ) -> Constraints:
         """
-        Create OC-DECLARE constraints manually from user input.
-        """
-        with tempfile.NamedTemporaryFile(suffix=".jsonocel", delete=False) as tmp:
-            tmp_path = Path(tmp.name)
-
-        ocel.write_ocel(tmp_path, ".jsonocel")
-        json_path = tmp_path.with_suffix(".json")
+        Check the conformance of OC-DECLARE constraints against the event log.
 
-        shutil.move(tmp_path, json_path)
+        In delta mode, the satisfied and total source event counts of the previous check on the same
+        log are kept, and only source events whose object neighbourhood changed are re-evaluated. In
+        approximate mode, conformance is estimated with a confidence interval (see ``check_sampled``).
+        Otherwise, results of earlier checks of the same constraints on a log with the same content are
+        reused if a result cache is configured (see ``check_cached``), and the remaining constraints are
+        checked on the resident worker if one is configured (see ``conformance_checker``).
 
-        processed = oc_declare.import_ocel2(str(json_path))
+        Scores are written into a copy of the input, so callers coalesced into one check (see
+        ``single_flight``) all keep their input unchanged and receive a resource of their own.
+        """
+        profiler = Profiler()
+        constraints = constraints.model_copy(update={"constraints": [c.model_copy() for c in constraints.constraints]})
+
+        if input.approximate:
+            estimates = check_sampled(ocel, constraints.constraints, input.cutoff, input.precision, profiler)
+            for c, (score, lower, upper) in zip(constraints.constraints, estimates, strict=True):
+                c.conformance = None if score is None else round(score, 3)
+                c.conformance_lower = round(lower, 3)
+                c.conformance_upper = round(upper, 3)
+        elif input.delta:
+            scores = check_incremental(ocel, constraints.constraints, profiler)
+            for c, score in zip(constraints.constraints, scores, strict=True):
+                c.conformance = score
+        elif settings.partition_workers > 1:
+            scores = check_partitioned(ocel, constraints.constraints, settings.partition_workers, profiler)
+            for c, score in zip(constraints.constraints, scores, strict=True):
+                c.conformance = score
+        else:
+            scores = check_cached(
+                ocel_fingerprint(ocel), constraints.constraints, conformance_checker(ocel, profiler), profiler
+            )
+            for c, score in zip(constraints.constraints, scores, strict=True):
+                c.conformance = score
 
-        return check_conformance_for_constraints(processed, constraints)
+        constraints.metrics = profiler.metrics
+        return constraints
@@ -0,0 +1,59 @@
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from pydantic import BaseModel
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class StageMetric(BaseModel):
+    stage: str
+    wall_time: float
+    cpu_time: float
+    peak_rss: int | None = None
+    nbytes: int | None = None
+    storage: str | None = None
+
+
+def peak_rss() -> int | None:
+    """Returns the peak resident set size of the process in bytes, if the platform reports it."""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Profiler:
+    """
+    Records wall time, CPU time and peak RSS of the stages of a plugin call.
+
+    CPU time is the time spent by the whole process (all threads), and peak RSS is the high-water
+    mark of the process at the end of the stage. A stage yields a dict through which it can report
+    extra fields of its metric, e.g. the size of the data it wrote.
+    """
+
+    def __init__(self):
+        self.metrics: list[StageMetric] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        extra = {}
+        try:
+            yield extra
+        finally:
+            self.metrics.append(
+                StageMetric(
+                    stage=name,
+                    wall_time=round(time.perf_counter() - wall, 6),
+                    cpu_time=round(time.process_time() - cpu, 6),
+                    peak_rss=peak_rss(),
+                    **extra,
+                )
+            )
@@ -0,0 +1,131 @@
+import json
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from threading import Lock
+
+from .config import settings
+from .constraints import Constraint
+from .profiling import Profiler
+
+# Largest number of keys per statement, well below SQLite's limit of bound parameters
+_CHUNK = 500
+
+
+def result_key(c: Constraint) -> str:
+    """Returns the canonical key of a constraint (see ``Constraint.key``) and its O2O mode, as a string."""
+    return json.dumps([*c.key(), c.o2o_mode], separators=(",", ":"))
+
+
+class ConformanceCache:
+    """
+    Persistent cache of conformance results in an SQLite database.
+
+    Results are keyed by the content fingerprint of the log and the canonical key of the constraint,
+    so overlapping sets of constraints checked against the same log share their results. Lookups
+    and inserts are done in bulk. Once the cache holds more than ``max_entries`` results, the least
+    recently used ones are evicted.
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conformance ("
+            " log TEXT NOT NULL, constraint_key TEXT NOT NULL, score REAL NOT NULL, used INTEGER NOT NULL,"
+            " PRIMARY KEY (log, constraint_key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS conformance_used ON conformance (used)")
+
+    def get_many(self, fingerprint: str, keys: Iterable[str]) -> dict[str, float]:
+        """Returns the cached results among ``keys`` for a log, marking them as recently used."""
+        keys = list(dict.fromkeys(keys))
+        found: dict[str, float] = {}
+        with self._lock:
+            now = time.time_ns()
+            for start in range(0, len(keys), _CHUNK):
+                chunk = keys[start : start + _CHUNK]
+                where = f"log = ? AND constraint_key IN ({','.join('?' * len(chunk))})"
+                rows = self._db.execute(
+                    f"SELECT constraint_key, score FROM conformance WHERE {where}", [fingerprint, *chunk]
+                ).fetchall()
+                found.update(rows)
+                if rows:
+                    self._db.execute(f"UPDATE conformance SET used = ? WHERE {where}", [now, fingerprint, *chunk])
+        return found
+
+    def put_many(self, fingerprint: str, results: dict[str, float]):
+        """Stores results for a log, evicting the least recently used results beyond ``max_entries``."""
+        if not results:
+            return
+        with self._lock:
+            now = time.time_ns()
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO conformance (log, constraint_key, score, used) VALUES (?, ?, ?, ?)",
+                    [(fingerprint, key, score, now) for key, score in results.items()],
+                )
+                (count,) = self._db.execute("SELECT COUNT(*) FROM conformance").fetchone()
+                if count > self.max_entries:
+                    self._db.execute(
+                        "DELETE FROM conformance WHERE rowid IN (SELECT rowid FROM conformance ORDER BY used LIMIT ?)",
+                        [count - self.max_entries],
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM conformance").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM conformance")
+
+
+conformance_cache = (
+    ConformanceCache(settings.result_cache_path, settings.result_cache_max_entries)
+    if settings.result_cache_path
+    else None
+)
+
+
+def check_cached(
+    fingerprint: str,
+    constraints: list[Constraint],
+    check: Callable[[list[Constraint]], list[float | None]],
+    profiler: Profiler | None = None,
+) -> list[float | None]:
+    """
+    Checks the conformance of constraints, serving known results from ``conformance_cache``.
+
+    Only constraints without a cached result are passed to ``check``, so the log is not even
+    loaded if every result is cached. Without a configured cache, every constraint is checked.
+
+    Returns the rounded conformance per input constraint, in input order.
+    """
+    profiler = profiler or Profiler()
+    keys = [result_key(c) for c in constraints]
+
+    cached: dict[str, float] = {}
+    if conformance_cache is not None:
+        with profiler.stage("result cache"):
+            cached = conformance_cache.get_many(fingerprint, keys)
+
+    missing = {key: c for key, c in zip(keys, constraints, strict=True) if key not in cached}
+    if missing:
+        scores = check(list(missing.values()))
+        checked = {key: score for key, score in zip(missing, scores, strict=True) if score is not None}
+        if conformance_cache is not None:
+            conformance_cache.put_many(fingerprint, checked)
+        cached.update(checked)
+
+    return [cached.get(key) for key in keys]
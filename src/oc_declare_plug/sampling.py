@@ -0,0 +1,213 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import oc_declare
+from oc_declare import OCDeclareArc
+from ocelescope import OCEL
+
+from .cache import load_processed
+from .components import ObjectComponents
+from .config import settings
+from .conformance import constraint_to_arc, count_satisfied, score_arcs
+from .constraint_set import map_ocdeclarearcs_to_constraints
+from .constraints import Constraint, ConstraintKey, O2OMode, arc_key
+from .handoff import ACTIVITY, OBJECT_TYPE, LogTables, import_ocel
+from .partition import with_weaker_variants, without_implied
+from .profiling import Profiler
+
+
+def wilson_interval(satisfied: int, total: int, confidence: float) -> tuple[float, float]:
+    """Returns the Wilson score interval of a proportion of ``satisfied`` out of ``total``."""
+    if not total:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = satisfied / total
+    denominator = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    # The interval always contains p, which rounding errors could otherwise break at 0 and 1
+    return max(0.0, min(p, centre - half_width)), min(1.0, max(p, centre + half_width))
+
+
+def sample_components(log: LogTables, fraction: float, seed: int = 0) -> LogTables:
+    """
+    Returns the sub-log of a random sample of the object components of a log (see ``ObjectComponents``).
+
+    Sampling whole components keeps every source event together with all events that can satisfy it,
+    so the conformance of a source event is the same in the sample as in the full log.
+    """
+    components = ObjectComponents.from_log(log)
+    labels = components.labels.unique()
+    size = min(len(labels), max(1, round(fraction * len(labels))))
+    sampled = np.random.default_rng(seed).choice(labels, size=size, replace=False)
+    return log.with_events(components.event_mask(log, sampled))
+
+
+def discover_sampled(
+    ocel: OCEL,
+    threshold: float,
+    o2o_mode: O2OMode,
+    acts_to_use: list[str] | None = None,
+    fraction: float = 0.1,
+    confirm_borderline: bool = False,
+    profiler: Profiler | None = None,
+    seed: int = 0,
+) -> list[Constraint]:
+    """
+    Discovers constraints approximately, on a sample of the object components of a log.
+
+    Candidates are the arcs discovered on the sample at ``threshold``, plus the arcs between pairs of
+    activities that only meet the looser threshold ``threshold + settings.sample_slack`` there, and
+    the weaker variants of both (see ``with_weaker_variants``): ``oc_declare`` does not report an arc
+    implied by a stronger arc type that holds, but the stronger arc may not hold on the full log.
+
+    For each candidate, the share of its source events that satisfy it is estimated from the sample,
+    with a Wilson interval at ``settings.sample_confidence``. Candidates whose interval lies below
+    ``1 - threshold`` are dropped. The rest are returned with the estimate as conformance and the
+    interval as ``conformance_lower``/``conformance_upper``.
+
+    Candidates whose interval contains ``1 - threshold`` are borderline. With ``confirm_borderline``,
+    they are checked on the full log and kept only if they meet the threshold there, with their
+    exact conformance. Arcs implied by another kept arc are left out, as in ``oc_declare``.
+
+    Source events of one component are not independent, so the intervals are somewhat optimistic
+    for logs with few, large components.
+    """
+    profiler = profiler or Profiler()
+    with profiler.stage("sample"):
+        sample = sample_components(LogTables.from_ocel(ocel), fraction, seed)
+    processed, _ = import_ocel(sample, profiler)
+
+    with profiler.stage("discover"):
+        # oc_declare fails on activities to use that do not occur in the log, which the sample may lack
+        occurring = set(sample.events[ACTIVITY].unique())
+        acts = [activity for activity in acts_to_use if activity in occurring] if acts_to_use else None
+        arcs = []
+        if acts is None or acts:
+            discovered = oc_declare.discover(processed, threshold, acts_to_use=acts, o2o_mode=o2o_mode)
+            # Pairs discovered at the threshold keep the object types oc_declare chose for them there
+            pairs = {(arc.from_activity, arc.to_activity) for arc in discovered}
+            pool_threshold = min(1.0, threshold + settings.sample_slack)
+            pool = oc_declare.discover(processed, pool_threshold, acts_to_use=acts, o2o_mode=o2o_mode)
+            arcs = with_weaker_variants(
+                [*discovered, *(arc for arc in pool if (arc.from_activity, arc.to_activity) not in pairs)],
+                set(sample.objects[OBJECT_TYPE].unique()),
+            )
+    with profiler.stage("conformance"):
+        counts = count_satisfied(processed, sample.events, arcs)
+
+    cutoff = 1 - threshold
+    estimates = []
+    for arc, arc_counts in zip(arcs, counts, strict=True):
+        if arc_counts is None:
+            continue
+        satisfied, total = arc_counts
+        lower, upper = wilson_interval(satisfied, total, settings.sample_confidence)
+        if upper >= cutoff:
+            estimates.append((arc, satisfied / total if total else None, lower, upper))
+
+    borderline = [i for i, (_, _, lower, _) in enumerate(estimates) if lower < cutoff]
+    if confirm_borderline and borderline:
+        full = load_processed(ocel, profiler=profiler)
+        with profiler.stage("confirm"):
+            scores = score_arcs(full, [estimates[i][0] for i in borderline], ndigits=None)
+        for i, score in zip(borderline, scores, strict=True):
+            estimates[i] = (estimates[i][0], score, score, score) if score is not None and score >= cutoff else None
+
+    kept = [estimate for estimate in estimates if estimate is not None]
+    implied = without_implied([arc_key(arc) for arc, _, _, _ in kept])
+    kept = [estimate for estimate, keep in zip(kept, implied, strict=True) if keep]
+    constraints = map_ocdeclarearcs_to_constraints(arc for arc, _, _, _ in kept)
+    for c, (_, score, lower, upper) in zip(constraints, kept, strict=True):
+        c.conformance = None if score is None else round(score, 3)
+        c.conformance_lower = round(lower, 3)
+        c.conformance_upper = round(upper, 3)
+        c.o2o_mode = o2o_mode
+    return constraints
+
+
+# Share of the components evaluated in the first batch of an approximate check; each batch doubles
+_FIRST_BATCH = 0.01
+
+Estimate = tuple[float | None, float, float]
+
+
+def check_sampled(
+    ocel: OCEL,
+    constraints: list[Constraint],
+    cutoff: float | None = None,
+    precision: float = 0.01,
+    profiler: Profiler | None = None,
+    seed: int = 0,
+) -> list[Estimate]:
+    """
+    Estimates the conformance of constraints, stopping early once the estimates are good enough.
+
+    The object components of the log are shuffled and evaluated in batches of doubling size. After
+    each batch, the share of satisfying source events of every constraint gets a Wilson interval at
+    ``settings.sample_confidence``. A constraint is settled once its interval lies entirely above or
+    below ``cutoff``, or once the interval is at most ``2 * precision`` wide. Only unsettled
+    constraints are checked on the next batch, and the check ends when all are settled or every
+    component was evaluated (which gives the exact conformance).
+
+    Returns the estimate and the interval bounds per input constraint, in input order.
+    """
+    profiler = profiler or Profiler()
+    log = LogTables.from_ocel(ocel)
+
+    with profiler.stage("components"):
+        components = ObjectComponents.from_log(log)
+        labels = np.random.default_rng(seed).permutation(components.labels.unique())
+
+    arcs: dict[ConstraintKey, OCDeclareArc] = {}
+    for c in constraints:
+        key = c.key()
+        if key not in arcs:
+            try:
+                arcs[key] = constraint_to_arc(c)
+            except Exception as e:
+                print(f"⚠️ Failed to check conformance for {c.source} → {c.target}: {e}")
+    counts = {key: (0, 0) for key in arcs}
+    open_keys = list(arcs)
+
+    start, size = 0, max(1, math.ceil(_FIRST_BATCH * len(labels)))
+    while open_keys and start < len(labels):
+        batch = log.with_events(components.event_mask(log, labels[start : start + size]))
+        start, size = start + size, size * 2
+        if batch.events.empty:
+            continue
+        processed, _ = import_ocel(batch, profiler)
+        with profiler.stage("conformance"):
+            batch_counts = count_satisfied(processed, batch.events, [arcs[key] for key in open_keys])
+
+        still_open = []
+        for key, added in zip(open_keys, batch_counts, strict=True):
+            if added is None:
+                counts.pop(key)
+                continue
+            satisfied, total = counts[key]
+            counts[key] = satisfied, total = satisfied + added[0], total + added[1]
+            if not _settled(satisfied, total, cutoff, precision):
+                still_open.append(key)
+        open_keys = still_open
+
+    # Constraints still open after the last batch were evaluated on every component, so they are exact
+    exact = set(open_keys)
+    estimates: dict[ConstraintKey, Estimate] = {}
+    for key, (satisfied, total) in counts.items():
+        score = satisfied / total if total else None
+        if key in exact and score is not None:
+            estimates[key] = (score, score, score)
+        else:
+            estimates[key] = (score, *wilson_interval(satisfied, total, settings.sample_confidence))
+    return [estimates.get(c.key(), (None, 0.0, 1.0)) for c in constraints]
+
+
+def _settled(satisfied: int, total: int, cutoff: float | None, precision: float) -> bool:
+    if not total:
+        return False
+    lower, upper = wilson_interval(satisfied, total, settings.sample_confidence)
+    if cutoff is not None and (lower >= cutoff or upper < cutoff):
+        return True
+    return (upper - lower) / 2 <= precision
@@ -0,0 +1,95 @@
+import copy
+import functools
+import inspect
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from threading import Lock
+
+from ocelescope import OCEL
+from pydantic import BaseModel
+
+from .cache import ocel_fingerprint
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        self.future: Future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one computation.
+
+    The first caller of ``do`` for a key runs the computation; callers arriving while it is in flight
+    wait for it and receive deep copies of its result (or its exception). Results are not kept once
+    the computation finished, so later calls compute afresh.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do[T](self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            return copy.deepcopy(call.future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            call.future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._calls[key]
+            shared = call.waiters > 0
+        # Waiters copy from a snapshot, so the leader's caller is free to modify its result
+        call.future.set_result(copy.deepcopy(result) if shared else None)
+        return result
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+flights = SingleFlight()
+
+
+def _normalize(value) -> Hashable:
+    if isinstance(value, OCEL):
+        return ocel_fingerprint(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    return repr(value)
+
+
+def single_flight[T](method: Callable[..., T]) -> Callable[..., T]:
+    """
+    Coalesces concurrent identical calls of a plugin method (see ``SingleFlight``).
+
+    Calls are identical if they are made for logs with the same content fingerprint and with equal
+    inputs, so users running the same job on a shared log wait on one computation.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+        key = (method.__name__, *((name, _normalize(value)) for name, value in arguments.items() if name != "self"))
+        return flights.do(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,80 @@
+import hashlib
+import os
+import tempfile
+from collections.abc import Hashable
+from pathlib import Path
+from threading import Lock
+
+import oc_declare
+
+from .handoff import LogTables, export_ocel
+from .profiling import Profiler
+
+
+class SnapshotStore:
+    """
+    Directory of handoff documents, keyed like the imported log cache.
+
+    ``oc_declare`` cannot serialize a pre-processed log, so a snapshot is the compact handoff
+    document the log was imported from. Loading a snapshot skips the export from the OCEL tables
+    and only pays the native import. Snapshots are evicted least-recently-used first once the
+    directory outgrows ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: Hashable) -> Path:
+        name = key if isinstance(key, str) else hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.directory / f"{name}.json"
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.path(key).exists()
+
+    def load(self, key: Hashable, profiler: Profiler | None = None):
+        """Imports the snapshot of ``key``, returning the pre-processed log and its size, or ``None``."""
+        profiler = profiler or Profiler()
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        with profiler.stage("import"):
+            return oc_declare.import_ocel2(str(path)), path.stat().st_size
+
+    def save(self, key: Hashable, log: LogTables, profiler: Profiler | None = None) -> Path:
+        """Writes the snapshot of ``key`` atomically, so concurrent readers never see a partial file."""
+        profiler = profiler or Profiler()
+        path = self.path(key)
+        fd, tmp_name = tempfile.mkstemp(suffix=".json.tmp", dir=self.directory)
+        os.close(fd)
+        try:
+            with profiler.stage("export") as stage:
+                stage.update(nbytes=export_ocel(log, Path(tmp_name)), storage="disk")
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path):
+        with self._lock:
+            snapshots = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshots.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in snapshots)
+            for _, size, path in sorted(snapshots):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
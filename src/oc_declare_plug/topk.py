@@ -0,0 +1,147 @@
+import heapq
+
+import oc_declare
+import pandas as pd
+from oc_declare import OCDeclareArc
+from ocelescope import OCEL
+
+from .cache import load_processed
+from .components import ObjectComponents
+from .conformance import score_arcs
+from .constraint_set import ARC_TYPES, map_ocdeclarearcs_to_constraints
+from .constraints import Constraint, ConstraintKey, O2OMode, arc_key
+from .handoff import ACTIVITY, EVENT_ID, OBJECT_ID, LogTables
+from .profiling import Profiler
+
+# Number of activity pairs evaluated in the first round of top-k discovery; each round doubles it
+_FIRST_ROUND = 8
+
+Pair = tuple[str, str]
+
+
+def cooccurrence_bounds(log: LogTables, o2o_mode: O2OMode) -> pd.Series:
+    """
+    Returns an upper bound of the conformance of any arc between each ordered pair of activities.
+
+    A source event can only satisfy an arc if a target event is related to it through its objects.
+    Without O2O relationships, that target event shares an object with the source event; otherwise it
+    lies in the same object component (see ``ObjectComponents``). The bound of a pair is the share of
+    source events with such a target event. Pairs without any such source event are left out (their
+    bound is 0).
+    """
+    relations = log.relations[[EVENT_ID, OBJECT_ID]].merge(log.events[[EVENT_ID, ACTIVITY]], on=EVENT_ID)
+    if o2o_mode == "None":
+        relations = relations.rename(columns={OBJECT_ID: "group"})
+    else:
+        labels = ObjectComponents.from_log(log).labels
+        relations = relations.assign(group=labels.reindex(relations[OBJECT_ID]).to_numpy()).drop(columns=OBJECT_ID)
+
+    group_activities = relations[["group", ACTIVITY]].drop_duplicates().rename(columns={ACTIVITY: "target"})
+    reachable = (
+        relations.rename(columns={ACTIVITY: "source"})
+        .merge(group_activities, on="group")[[EVENT_ID, "source", "target"]]
+        .drop_duplicates()
+    )
+    sources = log.events[ACTIVITY].value_counts()
+    counts = reachable.groupby(["source", "target"]).size()
+    return (counts / sources.reindex(counts.index.get_level_values("source")).to_numpy()).sort_values(
+        ascending=False, kind="stable"
+    )
+
+
+class _TopK:
+    """Keeps the ``k`` best scored arcs, overall or per arc type."""
+
+    def __init__(self, k: int, per_type: bool):
+        self.k = k
+        self.per_type = per_type
+        # Entries are (score, tie-breaker, arc); keys themselves are not comparable (their counts may be None)
+        self.heaps: dict[str | None, list[tuple[float, str, OCDeclareArc]]] = {
+            t: [] for t in (ARC_TYPES if per_type else (None,))
+        }
+
+    def push(self, arc: OCDeclareArc, key: ConstraintKey, score: float):
+        heap = self.heaps[key[0] if self.per_type else None]
+        entry = (score, repr(key), arc)
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def floor(self, default: float) -> float:
+        """Returns the lowest score an arc needs to enter any of the kept top-k lists."""
+        return min(heap[0][0] if len(heap) == self.k else default for heap in self.heaps.values())
+
+    def ranked(self) -> list[tuple[float, str, OCDeclareArc]]:
+        return sorted((entry for heap in self.heaps.values() for entry in heap), key=lambda e: (-e[0], e[1]))
+
+
+def discover_top_k(
+    ocel: OCEL,
+    threshold: float,
+    o2o_mode: O2OMode,
+    acts_to_use: list[str] | None,
+    k: int,
+    per_type: bool = False,
+    check_conformance: bool = False,
+    profiler: Profiler | None = None,
+) -> list[Constraint]:
+    """
+    Discovers the ``k`` constraints with the highest conformance (or ``k`` per arc type with ``per_type``).
+
+    Activity pairs are visited in rounds, in decreasing order of their co-occurrence bound (see
+    ``cooccurrence_bounds``), each round twice as large as the one before. A round discovers the arcs
+    among the activities of its pairs and keeps the best ones seen so far. Discovery stops once no
+    unvisited pair has a bound that reaches the score of the current ``k``-th best constraint, so
+    pairs that cannot make it into the result are never evaluated. Constraints are returned best
+    first.
+
+    Rounds discover at ``threshold`` itself: ``oc_declare`` picks object type bindings and leaves out
+    implied arcs depending on the threshold, so a tighter one would yield arcs that discovery at
+    ``threshold`` does not.
+
+    The bound assumes that every discovered arc requires at least one target event.
+    """
+    profiler = profiler or Profiler()
+    with profiler.stage("bounds"):
+        bounds = cooccurrence_bounds(LogTables.from_ocel(ocel), o2o_mode)
+        if acts_to_use:
+            pairs = bounds.index
+            bounds = bounds[
+                pairs.get_level_values("source").isin(acts_to_use) & pairs.get_level_values("target").isin(acts_to_use)
+            ]
+    processed = load_processed(ocel, profiler=profiler)
+
+    best = _TopK(k, per_type)
+    visited: set[Pair] = set()
+    size = _FIRST_ROUND
+    while True:
+        floor = best.floor(1 - threshold)
+        round_pairs = [pair for pair, bound in bounds.items() if bound >= floor and pair not in visited][:size]
+        if not round_pairs:
+            break
+        size *= 2
+        # Discovery on these activities evaluates every pair among them, not only the pairs of the round
+        activities = sorted({activity for pair in round_pairs for activity in pair})
+        round_visited = {(source, target) for source in activities for target in activities} - visited
+        visited |= round_visited
+
+        with profiler.stage("discover"):
+            arcs = oc_declare.discover(processed, threshold, acts_to_use=activities, o2o_mode=o2o_mode)
+        candidates = {}
+        for arc in arcs:
+            key = arc_key(arc)
+            if (key[1], key[2]) in round_visited:
+                candidates.setdefault(key, arc)
+        with profiler.stage("conformance"):
+            scores = score_arcs(processed, list(candidates.values()), ndigits=None)
+        for (key, arc), score in zip(candidates.items(), scores, strict=True):
+            if score is not None and score >= floor:
+                best.push(arc, key, score)
+
+    ranked = best.ranked()
+    constraints = map_ocdeclarearcs_to_constraints(arc for _, _, arc in ranked)
+    for c, (score, _, _) in zip(constraints, ranked, strict=True):
+        c.conformance = round(score, 3) if check_conformance else None
+        c.o2o_mode = o2o_mode
+    return constraints
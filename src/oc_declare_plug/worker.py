@@ -0,0 +1,194 @@
+import argparse
+import os
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+
+from ocelescope import OCEL
+
+from .cache import ProcessedOCELCache, load_processed_tables, ocel_fingerprint
+from .config import settings
+from .conformance import check_conformance_batch
+from .constraint_set import ConstraintSet
+from .constraints import Constraint, O2OMode
+from .discovery import discover_runs
+from .handoff import LogTables
+from .profiling import Profiler
+
+
+class WorkerUnavailable(ConnectionError):
+    """The worker could not be reached, or the connection to it was lost."""
+
+
+def _discover(
+    processed, log: LogTables, profiler: Profiler, threshold, o2o_mode, acts_to_use, check_conformance
+) -> ConstraintSet:
+    run = (threshold, o2o_mode)
+    return ConstraintSet.from_constraints(
+        discover_runs(processed, [run], acts_to_use, check_conformance, profiler, log)[run]
+    )
+
+
+def _check(processed, log: LogTables, profiler: Profiler, constraints: ConstraintSet) -> list[float | None]:
+    with profiler.stage("conformance"):
+        return check_conformance_batch(processed, constraints.to_constraints(), log)
+
+
+_OPERATIONS = {"discover": _discover, "check": _check}
+
+
+def private_directory(path: Path) -> Path:
+    """Creates a directory that only the current user can access, or checks that an existing one is."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = path.stat()
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} has to be a directory that only its owner can access")
+    return path
+
+
+def worker_authkey(address: Path, create: bool = False) -> bytes:
+    """
+    Returns the key with which clients authenticate at the worker on ``address``.
+
+    That is ``settings.worker_authkey`` if set, and otherwise the key in the file next to the socket,
+    which the worker fills with a new random key on start-up (``create``).
+    """
+    if settings.worker_authkey:
+        return settings.worker_authkey.encode()
+    path = address.with_name(address.name + ".key")
+    if create:
+        with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as fp:
+            fp.write(secrets.token_bytes(32))
+    return path.read_bytes()
+
+
+class Worker:
+    """
+    Resident process that serves discovery and conformance requests on a unix socket.
+
+    Start it with ``python -m oc_declare_plug`` and point ``OC_DECLARE_WORKER_ADDRESS`` of the
+    plugin at the same socket, so plugin calls skip interpreter start-up, module loading and log import.
+
+    The socket is created in a directory only accessible by its owner (see ``private_directory``),
+    and connections have to authenticate with the key of ``worker_authkey``, as requests and logs
+    are exchanged as pickles; constraints travel as a ``ConstraintSet`` of a few arrays rather than
+    one pickled model each. Every connection carries one request ``(operation, fingerprint, args)``.
+    If the tables of the log are not held yet, the worker answers ``("missing", None)`` and the client
+    sends them. Tables are
+    kept in an LRU bounded like the imported log cache, and imported logs in the process-wide
+    ``processed_ocel_cache``, so repeated requests on a log skip both the upload and the import.
+    At most ``max_jobs`` requests are computed at a time.
+    """
+
+    def __init__(self, address: Path, max_jobs: int):
+        self.address = address
+        self.logs = ProcessedOCELCache(settings.cache_max_entries, settings.cache_max_bytes)
+        self._jobs = threading.BoundedSemaphore(max_jobs)
+
+    def serve_forever(self):
+        private_directory(self.address.parent)
+        authkey = worker_authkey(self.address, create=True)
+        self.address.unlink(missing_ok=True)
+        with Listener(str(self.address), family="AF_UNIX", authkey=authkey) as listener:
+            print(f"🚀 oc_declare worker listening on {self.address}")
+            try:
+                while True:
+                    try:
+                        conn = listener.accept()
+                    except (AuthenticationError, EOFError, ConnectionError) as e:
+                        print(f"⚠️ Rejected oc_declare worker connection: {e}")
+                        continue
+                    threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.address.unlink(missing_ok=True)
+
+    def _handle(self, conn: Connection):
+        with conn:
+            try:
+                operation, fingerprint, args = conn.recv()
+                handler = _OPERATIONS[operation]
+                log = self.logs.get(fingerprint)
+                if log is None:
+                    conn.send(("missing", None))
+                    log = conn.recv()
+                    self.logs.put(fingerprint, log, _nbytes(log))
+
+                profiler = Profiler()
+                with self._jobs:
+                    processed = load_processed_tables(fingerprint, log, profiler)
+                    result = handler(processed, log, profiler, *args)
+                conn.send(("ok", (result, profiler.metrics)))
+            except (EOFError, OSError):
+                pass
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _nbytes(log: LogTables) -> int:
+    return sum(int(table.memory_usage(deep=True).sum()) for table in log)
+
+
+class WorkerClient:
+    """Sends plugin calls to a resident ``Worker``, uploading a log the first time the worker needs it."""
+
+    def __init__(self, address: Path):
+        self.address = address
+
+    def _call(self, operation: str, ocel: OCEL, profiler: Profiler, *args):
+        with profiler.stage("fingerprint"):
+            fingerprint = ocel_fingerprint(ocel)
+        try:
+            conn = Client(str(self.address), family="AF_UNIX", authkey=worker_authkey(self.address))
+        except (OSError, AuthenticationError) as e:
+            raise WorkerUnavailable(f"cannot connect to {self.address}: {e}") from e
+
+        try:
+            with conn:
+                conn.send((operation, fingerprint, args))
+                status, payload = conn.recv()
+                if status == "missing":
+                    with profiler.stage("upload"):
+                        conn.send(LogTables.from_ocel(ocel))
+                    status, payload = conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerUnavailable(f"connection to {self.address} lost: {e}") from e
+
+        if status == "error":
+            raise RuntimeError(f"oc_declare worker failed: {payload}")
+        result, metrics = payload
+        profiler.metrics.extend(metrics)
+        return result
+
+    def discover(
+        self,
+        ocel: OCEL,
+        threshold: float,
+        o2o_mode: O2OMode,
+        acts_to_use: list[str] | None,
+        check_conformance: bool,
+        profiler: Profiler,
+    ) -> list[Constraint]:
+        return self._call(
+            "discover", ocel, profiler, threshold, o2o_mode, acts_to_use, check_conformance
+        ).to_constraints()
+
+    def check(self, ocel: OCEL, constraints: list[Constraint], profiler: Profiler) -> list[float | None]:
+        """Returns the rounded conformance per input constraint, in input order."""
+        return self._call("check", ocel, profiler, ConstraintSet.from_constraints(constraints))
+
+
+worker_client = WorkerClient(settings.worker_address) if settings.worker_address else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident oc_declare worker holding imported logs in memory.")
+    parser.add_argument("--address", type=Path, default=settings.worker_address, help="Path of the unix socket")
+    parser.add_argument("--max-jobs", type=int, default=settings.worker_max_jobs, help="Concurrent requests")
+    args = parser.parse_args()
+    if args.address is None:
+        parser.error("--address or OC_DECLARE_WORKER_ADDRESS is required")
+    Worker(args.address, args.max_jobs).serve_forever()
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from ocelescope import OCEL
+from pm4py.objects.ocel.obj import OCEL as PM4PYOCEL
+from synthetic import SyntheticConfig, generate_ocel
+
+from oc_declare_plug.cache import processed_ocel_cache
+
+START = pd.Timestamp("2024-01-01")
+
+ACTIVITIES = ["place", "pack", "ship", "pay"]
+
+
+def make_ocel(
+    events: list[tuple[str, str, int, dict[str, str]]],
+    o2o: list[tuple[str, str]] = (),
+    name: str = "test",
+) -> OCEL:
+    """
+    Builds an OCEL from ``(event id, activity, minute, {object id: object type})`` tuples and O2O pairs.
+
+    Every object has to be related to at least one event or O2O pair; its type is taken from there.
+    """
+    object_types = {oid: otype for *_, objects in events for oid, otype in objects.items()}
+    events_df = pd.DataFrame(
+        [(eid, activity, START + pd.Timedelta(minutes=minute)) for eid, activity, minute, _ in events],
+        columns=["ocel:eid", "ocel:activity", "ocel:timestamp"],
+    )
+    objects_df = pd.DataFrame(list(object_types.items()), columns=["ocel:oid", "ocel:type"])
+    relations_df = pd.DataFrame(
+        [
+            (eid, activity, START + pd.Timedelta(minutes=minute), oid, otype, "")
+            for eid, activity, minute, objects in events
+            for oid, otype in objects.items()
+        ],
+        columns=["ocel:eid", "ocel:activity", "ocel:timestamp", "ocel:oid", "ocel:type", "ocel:qualifier"],
+    )
+    o2o_df = pd.DataFrame([(a, b, "") for a, b in o2o], columns=["ocel:oid", "ocel:oid_2", "ocel:qualifier"])
+    ocel = OCEL(PM4PYOCEL(events=events_df, objects=objects_df, relations=relations_df, o2o=o2o_df))
+    ocel.meta = {"fileName": name}
+    return ocel
+
+
+def order_log(cases: int = 12, name: str = "orders") -> OCEL:
+    """
+    Builds a small order log: every order is placed, packed, shipped and paid, and every other order
+    is shipped before it is paid. Items are packed with their order and linked to it through O2O.
+    """
+    events, o2o, minute = [], [], 0
+    for case in range(cases):
+        order, item = {f"o{case}": "order"}, {f"i{case}": "item"}
+        trace = ACTIVITIES if case % 2 else ["place", "pack", "pay", "ship"]
+        for activity in trace:
+            objects = {**order, **item} if activity == "pack" else order
+            events.append((f"e{len(events)}", activity, minute, objects))
+            minute += 1
+        o2o.append((f"o{case}", f"i{case}"))
+    return make_ocel(events, o2o, name)
+
+
+def synthetic_log(events: int = 5000, **config) -> OCEL:
+    """Builds a log of the benchmark generator (see ``benchmarks/synthetic.py``)."""
+    return generate_ocel(SyntheticConfig(events=events, **config))
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    processed_ocel_cache.clear()
+    yield
+    processed_ocel_cache.clear()
+
+
+@pytest.fixture
+def ocel() -> OCEL:
+    return order_log()
@@ -0,0 +1,88 @@
+import uuid
+
+from conftest import order_log
+
+from oc_declare_plug.cache import ProcessedOCELCache, load_processed, ocel_fingerprint, processed_ocel_cache
+from oc_declare_plug.profiling import Profiler
+
+
+def _stages(profiler: Profiler) -> list[str]:
+    return [metric.stage for metric in profiler.metrics]
+
+
+def test_entries_are_evicted_least_recently_used_first():
+    cache = ProcessedOCELCache(max_entries=2, max_bytes=100)
+    cache.put("a", "A", 10)
+    cache.put("b", "B", 10)
+    assert cache.get("a") == "A"
+    cache.put("c", "C", 10)
+    assert "b" not in cache
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.size == 20
+
+
+def test_byte_budget():
+    cache = ProcessedOCELCache(max_entries=10, max_bytes=100)
+    cache.put("a", "A", 60)
+    cache.put("b", "B", 30)
+    cache.put("c", "C", 30)
+    assert "a" not in cache
+    assert len(cache) == 2
+    assert cache.size == 60
+
+    # An entry over the whole budget is not kept, and replaces no other entry
+    cache.put("d", "D", 101)
+    assert "d" not in cache
+    assert len(cache) == 2
+
+    cache.put("b", "B", 50)
+    assert cache.size == 80
+    cache.configure(max_bytes=40)
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_disabled_cache():
+    cache = ProcessedOCELCache(max_entries=0, max_bytes=100)
+    cache.put("a", "A", 10)
+    assert cache.get("a") is None
+
+
+def test_fingerprint_depends_on_content_only():
+    ocel = order_log(name="one")
+    assert ocel_fingerprint(ocel) == ocel_fingerprint(order_log(name="two"))
+    assert ocel_fingerprint(ocel) != ocel_fingerprint(order_log(cases=13))
+
+    # Fingerprints are memoized per state of the log
+    ocel.ocel.events.loc[0, "ocel:activity"] = "cancel"
+    assert ocel_fingerprint(ocel) == ocel_fingerprint(order_log())
+    ocel.state_id = str(uuid.uuid4())
+    assert ocel_fingerprint(ocel) != ocel_fingerprint(order_log())
+
+
+def test_repeated_loads_skip_the_import():
+    first, second, third = Profiler(), Profiler(), Profiler()
+    processed = load_processed(order_log(name="one"), first)
+    assert "import" in _stages(first)
+    assert len(processed_ocel_cache) == 1
+
+    assert load_processed(order_log(name="two"), second) is processed
+    assert "import" not in _stages(second)
+
+    load_processed(order_log(cases=13), third)
+    assert "import" in _stages(third)
+    assert len(processed_ocel_cache) == 2
+
+
+def test_projections_are_served_by_larger_ones():
+    ocel = order_log()
+    first, second, third = Profiler(), Profiler(), Profiler()
+    projected = load_processed(ocel, first, activities=["place", "pack", "ship"])
+    assert "project" in _stages(first)
+
+    assert load_processed(ocel, second, activities=["ship", "place"]) is projected
+    assert _stages(second) == ["fingerprint"]
+
+    load_processed(ocel, third, activities=["place", "pay"])
+    assert "import" in _stages(third)
+    assert len(processed_ocel_cache) == 2
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from conftest import make_ocel
+
+from oc_declare_plug.components import ObjectComponents, connected_components
+from oc_declare_plug.handoff import EVENT_ID, LogTables
+
+
+def _brute_force(n, edges):
+    labels = list(range(n))
+    changed = True
+    while changed:
+        changed = False
+        for a, b in edges:
+            low = min(labels[a], labels[b])
+            for node in (a, b):
+                if labels[node] != low:
+                    labels = [low if label == labels[node] else label for label in labels]
+                    changed = True
+    return labels
+
+
+def test_connected_components_match_brute_force():
+    rng = np.random.default_rng(7)
+    for n in (1, 5, 40):
+        for edge_count in (0, n // 2, 2 * n):
+            left, right = rng.integers(0, n, edge_count), rng.integers(0, n, edge_count)
+            expected = _brute_force(n, list(zip(left.tolist(), right.tolist(), strict=True)))
+            assert connected_components(n, left, right).tolist() == expected
+
+
+def _log():
+    # o0 - o1 share an event, o2 - o3 are linked through O2O, o4 stands alone
+    events = [
+        ("e0", "a", 0, {"o0": "x", "o1": "y"}),
+        ("e1", "b", 1, {"o2": "x"}),
+        ("e2", "a", 2, {"o3": "y"}),
+        ("e3", "b", 3, {"o4": "x"}),
+        ("e4", "a", 4, {"o1": "y"}),
+    ]
+    return LogTables.from_ocel(make_ocel(events, o2o=[("o2", "o3")]))
+
+
+def _partition(components):
+    groups = components.labels.groupby(components.labels).groups
+    return sorted(sorted(group) for group in groups.values())
+
+
+def test_components_of_a_log():
+    components = ObjectComponents.from_log(_log())
+    assert _partition(components) == [["o0", "o1"], ["o2", "o3"], ["o4"]]
+    mask = components.event_mask(_log(), components.labels[["o0"]].to_numpy())
+    assert _log().events[EVENT_ID][mask].tolist() == ["e0", "e4"]
+
+
+def test_update_matches_components_of_the_whole_log():
+    log = _log()
+    first = log.with_events(log.events[EVENT_ID].isin(["e0", "e1", "e2"]))
+    components = ObjectComponents.from_log(first)
+
+    # e3 and e4 bring o4 in, then a new event merges o4 with o0 and o2
+    extended = make_ocel(
+        [
+            ("e0", "a", 0, {"o0": "x", "o1": "y"}),
+            ("e1", "b", 1, {"o2": "x"}),
+            ("e2", "a", 2, {"o3": "y"}),
+            ("e3", "b", 3, {"o4": "x"}),
+            ("e4", "a", 4, {"o1": "y"}),
+            ("e5", "b", 5, {"o4": "x", "o0": "x", "o2": "x"}),
+        ],
+        o2o=[("o2", "o3")],
+    )
+    full = LogTables.from_ocel(extended)
+    appended = full.events[EVENT_ID].isin(["e3", "e4", "e5"])
+    delta = full.with_events(appended)
+    touched = components.update(LogTables(delta.events, delta.objects, delta.relations, delta.o2o.iloc[:0]))
+
+    assert _partition(components) == _partition(ObjectComponents.from_log(full))
+    assert set(touched) == set(pd.unique(components.labels))
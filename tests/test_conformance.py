@@ -0,0 +1,31 @@
+import oc_declare
+from conftest import ACTIVITIES, order_log
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.config import settings
+from oc_declare_plug.conformance import score_arcs
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.handoff import LogTables
+
+
+def test_process_workers_after_native_calls():
+    ocel = order_log()
+    processed = load_processed(ocel)
+    arcs = oc_declare.discover(processed, 0.2, acts_to_use=ACTIVITIES)
+
+    sequential = score_arcs(processed, arcs, workers=1)
+    parallel = score_arcs(processed, arcs, workers=2, executor="process", log=LogTables.from_ocel(ocel))
+    assert len(arcs) > 1
+    assert parallel == sequential
+
+
+def test_process_workers_with_o2o_bindings(monkeypatch):
+    ocel = order_log()
+    processed = load_processed(ocel)
+    run = (0.2, "Direct")
+    expected = discover_runs(processed, [run], ACTIVITIES, check_conformance=True)[run]
+
+    monkeypatch.setattr(settings, "conformance_workers", 2)
+    monkeypatch.setattr(settings, "conformance_executor", "process")
+    constraints = discover_runs(processed, [run], ACTIVITIES, True, log=LogTables.from_ocel(ocel))[run]
+    assert [c.conformance for c in constraints] == [c.conformance for c in expected]
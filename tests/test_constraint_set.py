@@ -0,0 +1,65 @@
+import json
+import pickle
+
+import oc_declare
+from conftest import ACTIVITIES
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.constraint_set import ConstraintSet
+from oc_declare_plug.constraints import Constraint, arc_key, map_ocdeclarearc_to_constraint
+
+
+def _constraints():
+    return [
+        Constraint(type="EF", source="place", target="ship", all_objects=["order"], min=1, max=None, conformance=0.9),
+        Constraint(
+            type="DP",
+            source="pay",
+            target="pack",
+            any_objects=["item", "order"],
+            each_objects=["item"],
+            min=None,
+            max=2,
+            conformance_lower=0.25,
+            conformance_upper=0.5,
+            o2o_mode="Direct",
+        ),
+        Constraint(type="AS", source="ship", target="place", min=0, max=0, o2o_mode="None"),
+    ]
+
+
+def test_round_trip_through_constraints():
+    constraints = _constraints()
+    assert ConstraintSet.from_constraints(constraints).to_constraints() == constraints
+
+
+def test_take():
+    constraint_set = ConstraintSet.from_constraints(_constraints())
+    taken = constraint_set.take([2, 0, 2])
+    assert len(taken) == 3
+    assert taken.to_constraints() == [_constraints()[i] for i in (2, 0, 2)]
+    assert [row.key() for row in taken] == [c.key() for c in taken.to_constraints()]
+    assert constraint_set.take([False, True, True]).to_constraints() == _constraints()[1:]
+    assert len(constraint_set.take([])) == 0
+
+
+def test_round_trip_through_columns():
+    constraint_set = ConstraintSet.from_constraints(_constraints())
+    columns = json.loads(json.dumps(constraint_set.to_columns()))
+    assert ConstraintSet.from_columns(columns).to_constraints() == _constraints()
+    assert ConstraintSet.from_columns(constraint_set.take([1]).to_columns()).to_constraints() == _constraints()[1:2]
+
+
+def test_from_arcs_keeps_the_arcs(ocel):
+    arcs = oc_declare.discover(load_processed(ocel), 0.2, acts_to_use=ACTIVITIES)
+    constraint_set = ConstraintSet.from_arcs(arcs)
+    constraints = constraint_set.to_constraints()
+    assert constraints == [map_ocdeclarearc_to_constraint(arc) for arc in arcs]
+    assert all(c.to_arc() is arc for c, arc in zip(constraints, arcs, strict=True))
+    assert all(c.to_arc() is arcs[1] for c in constraint_set.take([1, 1]).to_constraints())
+
+    # Arcs are dropped on pickling, and rebuilt by the constraints when needed
+    unpickled = pickle.loads(pickle.dumps(constraint_set))
+    assert unpickled.arcs is None
+    assert [arc_key(c.to_arc()) for c in unpickled.to_constraints()] == list(map(arc_key, arcs))
+    assert len(ConstraintSet.from_arcs([])) == 0
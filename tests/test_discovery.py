@@ -0,0 +1,98 @@
+import pytest
+from conftest import ACTIVITIES, make_ocel, synthetic_log
+
+from oc_declare_plug.cache import load_processed, processed_ocel_cache
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.plugin import CheckInput, DiscoverInput, O2OModesInput, OcDeclare, SweepInput
+
+
+def _skipping_log():
+    # In every case, c lies between a and b, so b never directly follows a
+    events = []
+    for case in range(6):
+        for step, activity in enumerate("acb"):
+            events.append((f"e{case}-{step}", activity, 10 * case + step, {f"o{case}": "order"}))
+    return make_ocel(events, name="skipping")
+
+
+def _summary(constraints):
+    return sorted((c.type, c.source, c.target, c.conformance) for c in constraints)
+
+
+def test_discovery_on_some_activities_keeps_other_events():
+    ocel = _skipping_log()
+    result = OcDeclare().discover_constraints(ocel, DiscoverInput(acts_to_use=["a", "b"], check_conformance=True))
+
+    assert result.constraints
+    assert all(c.type not in ("DF", "DP") for c in result.constraints)
+    checked = OcDeclare().check_constraints(ocel, result.model_copy(deep=True), CheckInput())
+    assert _summary(checked.constraints) == _summary(result.constraints)
+
+
+def test_discovery_does_not_depend_on_cache_state():
+    ocel = _skipping_log()
+    input = DiscoverInput(acts_to_use=["a", "b"], check_conformance=True)
+
+    cold = OcDeclare().discover_constraints(ocel, input)
+    processed_ocel_cache.clear()
+    load_processed(ocel)
+    warm = OcDeclare().discover_constraints(ocel, input)
+    assert _summary(cold.constraints) == _summary(warm.constraints)
+
+
+@pytest.mark.parametrize("o2o_mode", ["None", "Direct", "Reversed", "Bidirectional"])
+def test_projected_discovery_matches_whole_log_discovery(o2o_mode):
+    ocel = synthetic_log(4000, activities=30, o2o_density=0.8, case_length=4)
+    acts_to_use = [f"Activity {i}" for i in (0, 1, 7, 12)]
+    run = (0.3, o2o_mode)
+    whole = discover_runs(load_processed(ocel), [run], acts_to_use, check_conformance=True)[run]
+
+    processed_ocel_cache.clear()
+    result = OcDeclare().discover_constraints(
+        ocel, DiscoverInput(threshold=0.3, o2o_mode=o2o_mode, acts_to_use=acts_to_use, check_conformance=True)
+    )
+    assert "project" in [m.stage for m in result.metrics]
+    assert sorted((repr(c.key()), c.conformance) for c in result.constraints) == sorted(
+        (repr(c.key()), c.conformance) for c in whole
+    )
+
+
+def test_sweep_matches_single_discoveries(ocel):
+    thresholds = [0.1, 0.3]
+    sweep = OcDeclare().sweep_thresholds(
+        ocel, SweepInput(thresholds=thresholds, acts_to_use=ACTIVITIES, check_conformance=True)
+    )
+    for threshold, result in zip(thresholds, sweep, strict=True):
+        single = OcDeclare().discover_constraints(
+            ocel, DiscoverInput(threshold=threshold, acts_to_use=ACTIVITIES, check_conformance=True)
+        )
+        assert _summary(result.constraints) == _summary(single.constraints)
+
+
+def test_o2o_modes_match_single_discoveries(ocel):
+    modes = ["None", "Direct", "Bidirectional"]
+    combined = OcDeclare().discover_o2o_modes(
+        ocel, O2OModesInput(acts_to_use=ACTIVITIES, o2o_modes=[*modes, "None"], check_conformance=True)
+    )
+    # The log is imported once for all modes
+    assert [m.stage for m in combined.metrics].count("import") == 1
+
+    for mode in modes:
+        single = OcDeclare().discover_constraints(
+            ocel, DiscoverInput(acts_to_use=ACTIVITIES, o2o_mode=mode, check_conformance=True)
+        )
+        tagged = [c for c in combined.constraints if c.o2o_mode == mode]
+        assert tagged
+        assert sorted((repr(c.key()), c.conformance) for c in tagged) == sorted(
+            (repr(c.key()), c.conformance) for c in single.constraints
+        )
+        assert {c.o2o_mode for c in single.constraints} == {mode}
+    assert len(combined.constraints) == sum(c.o2o_mode in modes for c in combined.constraints)
+
+
+def test_check_without_input():
+    ocel = _skipping_log()
+    result = OcDeclare().discover_constraints(ocel, DiscoverInput(acts_to_use=["a", "b"], check_conformance=True))
+    checked = OcDeclare().check_constraints(ocel, result.model_copy(deep=True))
+    assert _summary(checked.constraints) == _summary(result.constraints)
+    assert OcDeclare.check_constraints.__meta__._input_model is CheckInput
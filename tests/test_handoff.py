@@ -0,0 +1,127 @@
+import errno
+import io
+import json
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import oc_declare
+import pytest
+from conftest import ACTIVITIES, make_ocel
+
+from oc_declare_plug import handoff
+from oc_declare_plug.config import settings
+from oc_declare_plug.conformance import score_arcs
+from oc_declare_plug.handoff import LogTables, handoff_file, import_ocel
+from oc_declare_plug.plugin import DiscoverInput, OcDeclare
+from oc_declare_plug.profiling import Profiler
+
+
+def test_handoff_file_is_json(ocel):
+    profiler = Profiler()
+    with handoff_file(LogTables.from_ocel(ocel), profiler) as (path, nbytes):
+        assert path.suffix == ".json"
+        assert path.stat().st_size == nbytes
+    assert not path.exists()
+    assert profiler.metrics[0].storage in ("memory", "disk")
+
+
+def _storage(ocel) -> str:
+    profiler = Profiler()
+    with handoff_file(LogTables.from_ocel(ocel), profiler) as (path, _):
+        assert path.exists()
+    return profiler.metrics[0].storage
+
+
+@pytest.mark.skipif(not handoff._HAS_SHM, reason="no shared memory filesystem")
+def test_shared_memory_without_space(ocel, monkeypatch):
+    assert _storage(ocel) == "memory"
+    monkeypatch.setattr(handoff.os, "statvfs", lambda _: os.statvfs_result((4096, 4096, 16, 0, 0, 0, 0, 0, 0, 255)))
+    assert _storage(ocel) == "disk"
+
+
+@pytest.mark.skipif(not handoff._HAS_SHM, reason="no shared memory filesystem")
+def test_shared_memory_full_while_writing(ocel, monkeypatch):
+    export_ocel, attempts = handoff.export_ocel, []
+
+    def export_to_full_memory(log, path):
+        attempts.append(path)
+        if path.parent == handoff._SHM_DIR:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return export_ocel(log, path)
+
+    monkeypatch.setattr(handoff, "export_ocel", export_to_full_memory)
+    assert _storage(ocel) == "disk"
+    assert attempts[0].parent == handoff._SHM_DIR
+    assert not attempts[0].exists()
+
+
+def test_projection_keeps_whole_object_histories():
+    # Orders are placed, audited and shipped; other audits and the scans of items are unrelated to them
+    events = [("e0", "place", 0, {"o1": "order"}), ("e1", "audit", 1, {"o1": "order", "a1": "auditor"})]
+    events += [("e2", "ship", 2, {"o1": "order"}), ("e3", "audit", 3, {"a2": "auditor"})]
+    events += [("e4", "scan", 4, {"i1": "item"}), ("e5", "scan", 5, {"i2": "item"})]
+    log = LogTables.from_ocel(make_ocel(events, o2o=[("o1", "i1"), ("i2", "a2")]))
+
+    projected = log.project(["place", "ship"])
+    assert list(projected.events["ocel:eid"]) == ["e0", "e1", "e2"]
+    assert set(projected.objects["ocel:oid"]) == {"o1", "a1", "i1"}
+    assert list(zip(projected.o2o["ocel:oid"], projected.o2o["ocel:oid_2"], strict=True)) == [("o1", "i1")]
+
+
+def test_import_ocel(ocel):
+    processed, nbytes = import_ocel(LogTables.from_ocel(ocel))
+    assert processed is not None
+    assert nbytes > 0
+
+
+def test_document_is_written_in_chunks(ocel):
+    log = LogTables.from_ocel(ocel)
+    whole, chunked = io.StringIO(), io.StringIO()
+    handoff.write_ocel_json(log, whole)
+    handoff.write_ocel_json(log, chunked, chunk_size=3)
+    assert chunked.getvalue() == whole.getvalue()
+
+    document = json.loads(whole.getvalue())
+    assert sorted(document["eventTypes"], key=lambda t: t["name"]) == [
+        {"name": activity, "attributes": []} for activity in sorted(ACTIVITIES)
+    ]
+    assert len(document["events"]) == len(log.events)
+    assert len(document["objects"]) == len(log.objects)
+    assert sum(len(e["relationships"]) for e in document["events"]) == len(log.relations)
+    assert sum(len(o["relationships"]) for o in document["objects"]) == len(log.o2o)
+
+
+def test_stream_handoff_is_recorded(ocel, monkeypatch):
+    log = LogTables.from_ocel(ocel)
+    _, nbytes = import_ocel(log)
+
+    monkeypatch.setattr(settings, "handoff_mode", "stream")
+    profiler = Profiler()
+    _, streamed_bytes = import_ocel(log, profiler)
+    assert streamed_bytes == nbytes
+    assert [(m.stage, m.nbytes, m.storage) for m in profiler.metrics] == [("stream", nbytes, "pipe")]
+
+
+def test_stream_handoff_after_native_calls(ocel, monkeypatch):
+    log = LogTables.from_ocel(ocel)
+    expected, nbytes = import_ocel(log)
+    arcs = oc_declare.discover(expected, 0.2, acts_to_use=ACTIVITIES)
+
+    # The writer process must not be forked from this process, which runs native threads by now
+    monkeypatch.setattr(settings, "handoff_mode", "stream")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", DeprecationWarning)
+        with ThreadPoolExecutor(1) as pool:
+            streamed, streamed_bytes = pool.submit(import_ocel, log).result(timeout=60)
+    assert not [w for w in caught if "fork()" in str(w.message)]
+    assert streamed_bytes == nbytes
+    assert score_arcs(streamed, arcs) == score_arcs(expected, arcs)
+
+
+def test_discover_with_default_settings(ocel):
+    result = OcDeclare().discover_constraints(
+        ocel, DiscoverInput(threshold=0.2, acts_to_use=ACTIVITIES, check_conformance=True)
+    )
+    assert result.constraints
+    assert all(c.conformance is not None and c.conformance >= 0.8 for c in result.constraints)
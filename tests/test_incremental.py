@@ -0,0 +1,81 @@
+import pytest
+from conftest import ACTIVITIES, make_ocel, order_log
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.conformance import check_conformance_batch
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.incremental import check_incremental, discover_incremental
+
+RUN = (0.2, "None")
+
+
+def _events(trace: list[str], cases: int = 10, items: bool = False):
+    events = []
+    for case in range(cases):
+        for step, activity in enumerate(trace):
+            objects = {f"o{case}": "order"}
+            if items and activity == "pack":
+                objects[f"i{case}"] = "item"
+            events.append((f"e{case}-{step}", activity, 10 * case + step, objects))
+    return events
+
+
+def _appended(events):
+    return [*events, ("e-new", "place", 1000, {"o-new": "order"})]
+
+
+def _summary(constraints):
+    return sorted((repr(c.key()), c.conformance) for c in constraints)
+
+
+def _discover(ocel):
+    return discover_incremental(ocel, *RUN, ACTIVITIES, check_conformance=True)
+
+
+def _expected(ocel):
+    return discover_runs(load_processed(ocel), [RUN], ACTIVITIES, check_conformance=True)[RUN]
+
+
+def test_unrelated_log_with_the_same_name_and_event_ids():
+    _discover(make_ocel(_events(ACTIVITIES), name="unrelated"))
+    other = make_ocel(_appended(_events(ACTIVITIES[::-1])), name="unrelated")
+    assert _summary(_discover(other)) == _summary(_expected(other))
+
+
+def test_new_relations_of_existing_events():
+    _discover(make_ocel(_events(ACTIVITIES), name="relations"))
+    extended = make_ocel(_appended(_events(ACTIVITIES, items=True)), name="relations")
+    assert _summary(_discover(extended)) == _summary(_expected(extended))
+
+
+def test_arcs_implied_by_pool_candidates():
+    # Pack always follows place, but directly only in 9 of 12 orders: EF holds at 0.2, DF only in the pool
+    traces = [["place", "ship", "pack", "pay"]] * 3 + [["place", "pack", "pay"]] * 9
+    events = [
+        (f"e{case}-{step}", activity, 10 * case + step, {f"o{case}": "order"})
+        for case, trace in enumerate(traces)
+        for step, activity in enumerate(trace)
+    ]
+    for ocel in (make_ocel(events, name="implied"), make_ocel(_appended(events), name="implied")):
+        assert _summary(_discover(ocel)) == _summary(_expected(ocel))
+
+
+@pytest.mark.parametrize("o2o_mode", ["None", "Direct", "Bidirectional"])
+def test_arcs_with_o2o_bindings(o2o_mode):
+    run = (0.2, o2o_mode)
+    for ocel in (order_log(12, name=o2o_mode), order_log(13, name=o2o_mode)):
+        expected = discover_runs(load_processed(ocel), [run], ACTIVITIES, check_conformance=True)[run]
+        constraints = discover_incremental(ocel, *run, ACTIVITIES, check_conformance=True)
+        assert _summary(constraints) == _summary(expected)
+
+
+def test_conformance_of_appended_and_changed_logs():
+    first = make_ocel(_events(ACTIVITIES), name="checked")
+    constraints = _expected(first)
+    check_incremental(first, constraints)
+    for ocel in (
+        make_ocel(_appended(_events(ACTIVITIES)), name="checked"),
+        make_ocel(_appended(_events(ACTIVITIES, items=True)), name="checked"),
+        make_ocel(_appended(_events(ACTIVITIES[::-1])), name="checked"),
+    ):
+        assert check_incremental(ocel, constraints) == check_conformance_batch(load_processed(ocel), constraints)
@@ -0,0 +1,64 @@
+import oc_declare
+import pandas as pd
+import pytest
+from conftest import START, make_ocel
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.constraints import Constraint
+from oc_declare_plug.monitor import ConformanceMonitor, MonitorEvent
+
+BINDINGS = [
+    {"any_objects": ["order"]},
+    {"all_objects": ["order"]},
+    {"any_objects": ["item"]},
+    {"all_objects": ["item"]},
+    {"each_objects": ["item"]},
+    {"all_objects": ["order"], "each_objects": ["item"]},
+]
+BOUNDS = [(1, None), (1, 1), (0, 0), (2, None), (None, 1)]
+PAIRS = [("place", "pick"), ("pick", "ship"), ("ship", "pick"), ("pay", "place"), ("place", "ship"), ("pick", "pick")]
+
+
+def _events():
+    # Orders with one or two items, picked one at a time; every third order is shipped before it is picked
+    events = []
+    for case in range(6):
+        order = {f"o{case}": "order"}
+        items = [f"i{case}a", f"i{case}b"] if case % 2 else [f"i{case}a"]
+        all_items = dict.fromkeys(items, "item")
+        trace = [
+            ("place", {**order, **all_items}),
+            ("pick", {**order, items[0]: "item"}),
+            ("pick", {**order, items[-1]: "item"}),
+            ("ship", {**order, **all_items}),
+            ("pay", order),
+        ]
+        if case % 3 == 0:
+            trace = [trace[0], trace[3], trace[1], trace[4]]
+        for activity, objects in trace:
+            events.append((f"e{len(events)}", activity, len(events), objects))
+    return events
+
+
+@pytest.mark.parametrize("arc_type", ["EF", "EP", "AS", "DF", "DP"])
+def test_scores_match_oc_declare(arc_type):
+    constraints = [
+        Constraint(type=arc_type, source=source, target=target, min=low, max=high, **binding)
+        for source, target in PAIRS
+        for binding in BINDINGS
+        for low, high in BOUNDS
+    ]
+    events = _events()
+    monitor = ConformanceMonitor(constraints)
+    for eid, activity, minute, objects in events:
+        monitor.feed(MonitorEvent(eid, activity, START + pd.Timedelta(minutes=minute), objects))
+    monitor.flush()
+
+    processed = load_processed(make_ocel(events, name="monitored"))
+    expected = [round(oc_declare.check_conformance(processed, c.to_arc()), 3) for c in constraints]
+    assert monitor.scores() == expected
+
+
+def test_constraints_without_object_types_are_rejected():
+    with pytest.raises(ValueError, match="no object types"):
+        ConformanceMonitor([Constraint(type="EF", source="place", target="ship", min=1, max=None)])
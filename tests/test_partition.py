@@ -0,0 +1,86 @@
+import os
+import signal
+
+import oc_declare
+import pytest
+from conftest import ACTIVITIES, make_ocel, order_log, synthetic_log
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.conformance import check_conformance_batch, score_arcs
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.handoff import LogTables
+from oc_declare_plug.partition import PartitionedLog, discover_partitioned
+
+
+def _summary(constraints):
+    return sorted((repr(c.key()), c.conformance) for c in constraints)
+
+
+def test_partitioned_counts_after_native_calls():
+    ocel = order_log()
+    processed = load_processed(ocel)
+    arcs = oc_declare.discover(processed, 0.2, acts_to_use=ACTIVITIES)
+
+    with PartitionedLog(LogTables.from_ocel(ocel), 2) as partitioned:
+        counts = partitioned.count(arcs)
+    assert [satisfied / total for satisfied, total in counts] == score_arcs(processed, arcs, ndigits=None)
+
+
+def test_dead_worker_fails_the_request():
+    with PartitionedLog(LogTables.from_ocel(order_log()), 2) as partitioned:
+        partitioned._workers[1].kill()
+        with pytest.raises(RuntimeError, match="exited unexpectedly"):
+            partitioned.discover(0.2, ACTIVITIES, "None")
+
+
+def test_stuck_worker_fails_the_request():
+    with PartitionedLog(LogTables.from_ocel(order_log()), 2) as partitioned:
+        partitioned.timeout = 1.0
+        os.kill(partitioned._workers[0].pid, signal.SIGSTOP)
+        with pytest.raises(RuntimeError, match="did not answer"):
+            partitioned.discover(0.2, ACTIVITIES, "None")
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.2, 0.6])
+def test_partitioned_discovery_matches_discovery(threshold):
+    # Shards hold either orders that are paid before shipping or orders that are shipped first
+    ocel = order_log()
+    run = (threshold, "None")
+    expected = discover_runs(load_processed(ocel), [run], ACTIVITIES, check_conformance=True)[run]
+
+    constraints = discover_partitioned(ocel, *run, ACTIVITIES, workers=2, check_conformance=True)
+    assert _summary(constraints) == _summary(expected)
+
+
+def test_partitioned_discovery_rejects_o2o_modes():
+    with pytest.raises(ValueError, match="O2O mode"):
+        discover_partitioned(order_log(), 0.2, "Direct", ACTIVITIES, workers=2)
+
+
+def test_partitioned_discovery_on_a_synthetic_log():
+    ocel = synthetic_log(o2o_density=0)
+    run = (0.4, "None")
+    expected = discover_runs(load_processed(ocel), [run], None, check_conformance=True)[run]
+
+    constraints = discover_partitioned(ocel, *run, None, workers=2, check_conformance=True)
+    assert set(_summary(expected)) <= set(_summary(constraints))
+    # Shards may pick more object types for a binding than the whole log, with the exact conformance
+    extra = [c for c in constraints if c.key() not in {e.key() for e in expected}]
+    assert extra
+    assert {(c.type, c.source, c.target) for c in extra} <= {(c.type, c.source, c.target) for c in expected}
+    assert [c.conformance for c in extra] == check_conformance_batch(load_processed(ocel), extra)
+    assert all(c.conformance >= 0.6 for c in extra)
+
+
+def test_shards_without_some_activities():
+    # The shard of o1 has no pay event
+    events = [
+        ("e0", "place", 0, {"o0": "order"}),
+        ("e1", "pay", 1, {"o0": "order"}),
+        ("e2", "place", 2, {"o1": "order"}),
+    ]
+    ocel = make_ocel(events)
+    run = (0.6, "None")
+    expected = discover_runs(load_processed(ocel), [run], ["place", "pay"], check_conformance=True)[run]
+    constraints = discover_partitioned(ocel, *run, ["place", "pay"], workers=2, check_conformance=True)
+    assert _summary(constraints) == _summary(expected)
@@ -0,0 +1,40 @@
+import pytest
+from conftest import ACTIVITIES
+
+from oc_declare_plug.constraints import Constraints
+from oc_declare_plug.plugin import DiscoverInput, OcDeclare
+from oc_declare_plug.profiling import Profiler
+
+
+def test_stage_metrics():
+    profiler = Profiler()
+    with profiler.stage("export") as stage:
+        stage.update(nbytes=42, storage="disk")
+    with pytest.raises(RuntimeError), profiler.stage("import"):
+        raise RuntimeError("import failed")
+
+    export, failed = profiler.metrics
+    assert (export.stage, export.nbytes, export.storage) == ("export", 42, "disk")
+    assert failed.stage == "import"
+    assert all(m.wall_time >= 0 and m.cpu_time >= 0 for m in profiler.metrics)
+
+
+def test_discovery_reports_its_stages(ocel):
+    result = OcDeclare().discover_constraints(
+        ocel, DiscoverInput(threshold=0.2, acts_to_use=ACTIVITIES, check_conformance=True)
+    )
+    stages = [m.stage for m in result.metrics]
+    assert stages == ["fingerprint", "project", "export", "import", "discover", "map", "conformance"]
+    assert result.metrics[2].nbytes > 0
+    assert result.metrics[2].storage in ("memory", "disk")
+
+    # Metrics are part of the resource
+    assert Constraints.model_validate_json(result.model_dump_json()).metrics == result.metrics
+
+
+def test_check_reports_its_stages(ocel):
+    plugin = OcDeclare()
+    discovered = plugin.discover_constraints(ocel, DiscoverInput(threshold=0.2, acts_to_use=ACTIVITIES))
+    checked = plugin.check_constraints(ocel, discovered)
+    # The log was imported by discovery already
+    assert [m.stage for m in checked.metrics] == ["fingerprint", "conformance"]
@@ -0,0 +1,53 @@
+import pytest
+
+from oc_declare_plug import result_cache
+from oc_declare_plug.constraints import Constraint
+from oc_declare_plug.result_cache import ConformanceCache, check_cached, result_key
+
+
+def _constraint(target: str, **fields) -> Constraint:
+    return Constraint(type="EF", source="place", target=target, all_objects=["order"], min=1, max=None, **fields)
+
+
+def test_keys_ignore_object_type_order_and_conformance():
+    a = _constraint("ship", any_objects=["item", "order"], conformance=0.5)
+    b = _constraint("ship", any_objects=["order", "item"])
+    assert result_key(a) == result_key(b)
+    assert result_key(a) != result_key(b.model_copy(update={"o2o_mode": "Direct"}))
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    cache = ConformanceCache(tmp_path / "results.sqlite", max_entries=2)
+    cache.put_many("log", {"a": 0.1, "b": 0.2})
+    assert cache.get_many("log", ["a", "c"]) == {"a": 0.1}
+    cache.put_many("log", {"c": 0.3})
+    assert len(cache) == 2
+    assert cache.get_many("log", ["a", "b", "c"]) == {"a": 0.1, "c": 0.3}
+    assert cache.get_many("other log", ["a"]) == {}
+
+
+def test_results_survive_a_restart(tmp_path):
+    ConformanceCache(tmp_path / "results.sqlite", max_entries=10).put_many("log", {"a": 0.5})
+    assert ConformanceCache(tmp_path / "results.sqlite", max_entries=10).get_many("log", ["a"]) == {"a": 0.5}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ConformanceCache(tmp_path / "results.sqlite", max_entries=100)
+    monkeypatch.setattr(result_cache, "conformance_cache", cache)
+    return cache
+
+
+def test_only_missing_constraints_are_checked(cache):
+    checked = []
+
+    def check(constraints):
+        checked.append([c.target for c in constraints])
+        return [0.5 if c.target == "ship" else None for c in constraints]
+
+    assert check_cached("log", [_constraint("ship"), _constraint("pay")], check) == [0.5, None]
+    assert check_cached("log", [_constraint("pay"), _constraint("ship")], check) == [None, 0.5]
+    # Failed checks are not cached
+    assert checked == [["ship", "pay"], ["pay"]]
+    assert check_cached("other log", [_constraint("ship")], check) == [0.5]
+    assert checked[-1] == ["ship"]
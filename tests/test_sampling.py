@@ -0,0 +1,137 @@
+import pytest
+from conftest import ACTIVITIES, make_ocel, order_log, synthetic_log
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.components import ObjectComponents
+from oc_declare_plug.conformance import check_conformance_batch
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.handoff import EVENT_ID, OBJECT_ID, LogTables
+from oc_declare_plug.plugin import CheckInput, DiscoverInput, OcDeclare
+from oc_declare_plug.profiling import Profiler
+from oc_declare_plug.sampling import check_sampled, discover_sampled, sample_components, wilson_interval
+
+
+def _summary(constraints):
+    return sorted((repr(c.key()), c.conformance) for c in constraints)
+
+
+def _expected(ocel, run, acts_to_use):
+    return discover_runs(load_processed(ocel), [run], acts_to_use, check_conformance=True)[run]
+
+
+def test_arcs_implied_by_candidates():
+    # b always follows a, but directly only in 9 of 12 cases: EF holds at 0.2, DF only at the looser threshold
+    traces = [["a", "c", "b"]] * 3 + [["a", "b"]] * 9
+    events = [
+        (f"e{case}-{step}", activity, 10 * case + step, {f"o{case}": "order"})
+        for case, trace in enumerate(traces)
+        for step, activity in enumerate(trace)
+    ]
+    ocel = make_ocel(events)
+
+    constraints = discover_sampled(ocel, 0.2, "None", fraction=0.99, confirm_borderline=True)
+    assert _summary(constraints) == _summary(_expected(ocel, (0.2, "None"), None))
+
+
+@pytest.mark.parametrize("threshold", [0.2, 0.6])
+@pytest.mark.parametrize("o2o_mode", ["None", "Direct"])
+def test_full_sample_matches_discovery(threshold, o2o_mode):
+    ocel = order_log()
+    constraints = discover_sampled(ocel, threshold, o2o_mode, ACTIVITIES, fraction=1.0, confirm_borderline=True)
+    assert _summary(constraints) == _summary(_expected(ocel, (threshold, o2o_mode), ACTIVITIES))
+
+
+def test_wilson_interval():
+    lower, upper = wilson_interval(90, 100, 0.95)
+    assert lower == pytest.approx(0.8256, abs=1e-4)
+    assert upper == pytest.approx(0.9448, abs=1e-4)
+    assert wilson_interval(0, 0, 0.95) == (0.0, 1.0)
+    assert wilson_interval(10, 10, 0.95)[1] == 1.0
+    assert [wilson_interval(0, total, 0.95)[0] for total in range(1, 100)] == [0.0] * 99
+    assert wilson_interval(900, 1000, 0.95)[1] - wilson_interval(900, 1000, 0.95)[0] < upper - lower
+    assert wilson_interval(90, 100, 0.99)[0] < lower
+
+
+def test_samples_keep_whole_components():
+    log = LogTables.from_ocel(synthetic_log(2000))
+    sample = sample_components(log, 0.2, seed=1)
+    assert 0 < len(sample.events) < len(log.events)
+
+    labels = ObjectComponents.from_log(log).labels
+    sampled = set(labels.reindex(sample.relations[OBJECT_ID]))
+    in_sampled_components = log.relations[labels.reindex(log.relations[OBJECT_ID]).isin(sampled).to_numpy()]
+    assert set(sample.events[EVENT_ID]) == set(in_sampled_components[EVENT_ID])
+    assert sample_components(log, 0.2, seed=1).events.equals(sample.events)
+
+
+def test_sampled_intervals():
+    ocel = synthetic_log(5000)
+    threshold = 0.3
+    constraints = discover_sampled(ocel, threshold, "None", fraction=0.3)
+    assert constraints
+    for c in constraints:
+        assert c.conformance_lower <= c.conformance <= c.conformance_upper
+        assert c.conformance_upper >= 1 - threshold
+
+    # Borderline constraints are checked on the full log: kept with their exact conformance, or dropped
+    confirmed = {
+        repr(c.key()): c for c in discover_sampled(ocel, threshold, "None", fraction=0.3, confirm_borderline=True)
+    }
+    borderline = [c for c in constraints if c.conformance_lower < 1 - threshold]
+    assert borderline
+    for c, score in zip(borderline, check_conformance_batch(load_processed(ocel), borderline), strict=True):
+        kept = confirmed.get(repr(c.key()))
+        if score < 1 - threshold:
+            assert kept is None
+        elif kept is not None:
+            assert kept.conformance == kept.conformance_lower == kept.conformance_upper == score
+
+
+def test_sampled_discovery_in_the_plugin(ocel):
+    result = OcDeclare().discover_constraints(
+        ocel, DiscoverInput(threshold=0.2, acts_to_use=ACTIVITIES, sample_fraction=0.5)
+    )
+    assert result.constraints
+    assert result.threshold == 0.2
+    assert all(c.conformance_lower is not None for c in result.constraints)
+    assert "sample" in [m.stage for m in result.metrics]
+
+
+def _synthetic_constraints(ocel):
+    return _expected(ocel, (0.5, "None"), None)
+
+
+def test_check_until_every_component_is_exact():
+    ocel = synthetic_log(5000)
+    constraints = _synthetic_constraints(ocel)
+    estimates = check_sampled(ocel, constraints, precision=1e-9)
+    for c, (score, lower, upper) in zip(constraints, estimates, strict=True):
+        assert round(score, 3) == c.conformance
+        assert lower == score == upper
+
+
+def test_check_stops_once_the_cutoff_is_cleared():
+    ocel = synthetic_log(5000)
+    cutoff = 0.75
+    constraints = [c for c in _synthetic_constraints(ocel) if abs(c.conformance - cutoff) >= 0.1]
+    exact, early = Profiler(), Profiler()
+    check_sampled(ocel, constraints, precision=1e-9, profiler=exact)
+    estimates = check_sampled(ocel, constraints, cutoff=cutoff, precision=1e-9, profiler=early)
+
+    def imports(profiler):
+        return [m.stage for m in profiler.metrics].count("import")
+
+    assert imports(early) < imports(exact)
+    for c, (score, lower, upper) in zip(constraints, estimates, strict=True):
+        assert lower <= score <= upper
+        # A settled interval lies on the same side of the cutoff as the exact conformance
+        assert lower >= cutoff if c.conformance >= cutoff else upper < cutoff
+
+
+def test_approximate_check_in_the_plugin(ocel):
+    plugin = OcDeclare()
+    discovered = plugin.discover_constraints(ocel, DiscoverInput(threshold=0.2, acts_to_use=ACTIVITIES))
+    checked = plugin.check_constraints(ocel, discovered, CheckInput(approximate=True, precision=0.05))
+    assert checked.constraints
+    for c in checked.constraints:
+        assert c.conformance_lower <= c.conformance <= c.conformance_upper
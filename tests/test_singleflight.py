@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import ACTIVITIES
+
+from oc_declare_plug import plugin
+from oc_declare_plug.plugin import DiscoverInput, OcDeclare
+from oc_declare_plug.singleflight import SingleFlight, flights
+
+
+def _run_concurrently(flight: SingleFlight, fn, callers: int) -> list:
+    """Calls ``fn`` through ``flight`` from several threads, letting it finish once all callers joined the flight."""
+    release = threading.Event()
+
+    def leader():
+        release.wait(5)
+        return fn()
+
+    with ThreadPoolExecutor(callers) as pool:
+        futures = [pool.submit(flight.do, "key", leader) for _ in range(callers)]
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            with flight._lock:
+                call = flight._calls.get("key")
+                if call is not None and call.waiters == callers - 1:
+                    break
+            time.sleep(0.01)
+        release.set()
+    return futures
+
+
+def test_concurrent_calls_are_coalesced():
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"result": [1, 2]}
+
+    results = [future.result() for future in _run_concurrently(flight, compute, callers=4)]
+    assert len(calls) == 1
+    assert results == [{"result": [1, 2]}] * 4
+    # Every caller owns its result
+    assert len({id(result) for result in results}) == 4
+    assert len(flight) == 0
+
+
+def test_exceptions_reach_every_caller():
+    def fail():
+        raise RuntimeError("failed")
+
+    for future in _run_concurrently(SingleFlight(), fail, callers=2):
+        with pytest.raises(RuntimeError, match="failed"):
+            future.result()
+
+
+def test_later_calls_compute_afresh():
+    flight = SingleFlight()
+    results = iter([1, 2])
+    assert flight.do("key", lambda: next(results)) == 1
+    assert flight.do("key", lambda: next(results)) == 2
+
+
+def test_coalesced_checks_leave_every_input_unchanged(ocel, monkeypatch):
+    discovered = OcDeclare().discover_constraints(ocel, DiscoverInput(threshold=0.2, acts_to_use=ACTIVITIES))
+    assert all(c.conformance is None for c in discovered.constraints)
+    inputs = [discovered.model_copy(deep=True) for _ in range(2)]
+
+    # The leader checks only once the other caller waits on it
+    check_cached = plugin.check_cached
+
+    def check_once_joined(*args):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not any(call.waiters for call in flights._calls.values()):
+            time.sleep(0.01)
+        return check_cached(*args)
+
+    monkeypatch.setattr(plugin, "check_cached", check_once_joined)
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(lambda constraints: OcDeclare().check_constraints(ocel, constraints), inputs))
+
+    assert [c.conformance for c in results[0].constraints] == [c.conformance for c in results[1].constraints]
+    assert all(c.conformance is not None for c in results[0].constraints)
+    assert inputs == [discovered] * 2
+    assert len({id(resource) for resource in [*inputs, *results]}) == 4
@@ -0,0 +1,60 @@
+import os
+
+import oc_declare
+from conftest import ACTIVITIES, order_log
+
+from oc_declare_plug import cache
+from oc_declare_plug.cache import load_processed, processed_ocel_cache
+from oc_declare_plug.conformance import score_arcs
+from oc_declare_plug.handoff import LogTables, import_ocel
+from oc_declare_plug.profiling import Profiler
+from oc_declare_plug.snapshot import SnapshotStore
+
+
+def test_snapshot_round_trip(tmp_path, ocel):
+    store = SnapshotStore(tmp_path, max_bytes=10**9)
+    log = LogTables.from_ocel(ocel)
+    assert "log" not in store
+    assert store.load("log") is None
+
+    path = store.save("log", log)
+    assert "log" in store
+    assert not list(tmp_path.glob("*.tmp"))
+    loaded, nbytes = store.load("log")
+    assert nbytes == path.stat().st_size
+
+    expected, _ = import_ocel(log)
+    arcs = oc_declare.discover(expected, 0.2, acts_to_use=ACTIVITIES)
+    assert score_arcs(loaded, arcs) == score_arcs(expected, arcs)
+
+
+def test_least_recently_used_snapshots_are_evicted(tmp_path):
+    logs = {cases: LogTables.from_ocel(order_log(cases)) for cases in (10, 11, 12)}
+    store = SnapshotStore(tmp_path, max_bytes=10**9)
+    sizes = {cases: store.save(cases, log).stat().st_size for cases, log in logs.items()}
+    for cases, age in ((10, 30), (11, 20), (12, 10)):
+        os.utime(store.path(cases), (0, 1_000_000 - age))
+
+    # Loading a snapshot marks it as used
+    store.load(10)
+    store.max_bytes = sizes[10] + sizes[12] + 1
+    store.save(12, logs[12])
+    assert [cases in store for cases in (10, 11, 12)] == [True, False, True]
+
+    # The snapshot just saved is kept even if it alone exceeds the budget
+    store.max_bytes = 1
+    store.save(11, logs[11])
+    assert [cases in store for cases in (10, 11, 12)] == [False, True, False]
+
+
+def test_imports_are_served_from_snapshots(tmp_path, monkeypatch, ocel):
+    monkeypatch.setattr(cache, "snapshots", SnapshotStore(tmp_path, max_bytes=10**9))
+    first, second = Profiler(), Profiler()
+    load_processed(ocel, first)
+    assert [m.stage for m in first.metrics] == ["fingerprint", "export", "import"]
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # As after a restart of the process
+    processed_ocel_cache.clear()
+    load_processed(ocel, second)
+    assert [m.stage for m in second.metrics] == ["fingerprint", "import"]
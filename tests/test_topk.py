@@ -0,0 +1,42 @@
+import pytest
+from conftest import ACTIVITIES, order_log, synthetic_log
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.constraint_set import ARC_TYPES
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.topk import discover_top_k
+
+
+def _best(constraints, k):
+    return sorted((c.conformance for c in constraints), reverse=True)[:k]
+
+
+def _assert_top_k(ocel, acts_to_use, threshold, o2o_mode, k):
+    run = (threshold, o2o_mode)
+    discovered = discover_runs(load_processed(ocel), [run], acts_to_use, check_conformance=True)[run]
+    keys = {c.key() for c in discovered}
+
+    top = discover_top_k(ocel, threshold, o2o_mode, acts_to_use, k, check_conformance=True)
+    assert [c.conformance for c in top] == _best(discovered, k)
+    assert all(c.key() in keys for c in top)
+
+    per_type = discover_top_k(ocel, threshold, o2o_mode, acts_to_use, k, per_type=True, check_conformance=True)
+    for arc_type in ARC_TYPES:
+        of_type = [c for c in per_type if c.type == arc_type]
+        assert sorted((c.conformance for c in of_type), reverse=True) == _best(
+            [c for c in discovered if c.type == arc_type], k
+        )
+        assert all(c.key() in keys for c in of_type)
+
+
+@pytest.mark.parametrize("threshold", [0.2, 0.6, 1.0])
+@pytest.mark.parametrize("o2o_mode", ["None", "Direct"])
+@pytest.mark.parametrize("k", [1, 3, 50])
+def test_top_k_matches_sorted_discovery(threshold, o2o_mode, k):
+    _assert_top_k(order_log(), ACTIVITIES, threshold, o2o_mode, k)
+
+
+@pytest.mark.parametrize("o2o_mode", ["None", "Direct"])
+@pytest.mark.parametrize("k", [5, 20])
+def test_top_k_on_a_synthetic_log(o2o_mode, k):
+    _assert_top_k(synthetic_log(), None, 0.4, o2o_mode, k)
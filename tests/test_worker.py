@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+from conftest import ACTIVITIES, order_log
+
+from oc_declare_plug.cache import load_processed
+from oc_declare_plug.config import settings
+from oc_declare_plug.conformance import check_conformance_batch
+from oc_declare_plug.discovery import discover_runs
+from oc_declare_plug.profiling import Profiler
+from oc_declare_plug.worker import Worker, WorkerClient, WorkerUnavailable
+
+
+@pytest.fixture
+def address(tmp_path):
+    address = tmp_path / "worker" / "socket"
+    threading.Thread(target=Worker(address, max_jobs=1).serve_forever, daemon=True).start()
+    for _ in range(100):
+        if address.exists():
+            return address
+        time.sleep(0.05)
+    raise TimeoutError(f"worker did not listen on {address}")
+
+
+def test_check_on_worker(address):
+    ocel = order_log()
+    run = (0.2, "None")
+    constraints = discover_runs(load_processed(ocel), [run], ACTIVITIES)[run]
+
+    scores = WorkerClient(address).check(ocel, constraints, Profiler())
+    assert scores == check_conformance_batch(load_processed(ocel), constraints)
+
+
+def test_discover_on_worker(address):
+    ocel = order_log()
+    run = (0.2, "Direct")
+    constraints = WorkerClient(address).discover(ocel, *run, ACTIVITIES, True, Profiler())
+    assert constraints == discover_runs(load_processed(ocel), [run], ACTIVITIES, check_conformance=True)[run]
+
+
+def test_socket_is_private(address):
+    assert address.parent.stat().st_mode & 0o777 == 0o700
+    assert address.with_name(address.name + ".key").stat().st_mode & 0o777 == 0o600
+
+
+def test_unauthenticated_clients_are_rejected(address, monkeypatch):
+    monkeypatch.setattr(settings, "worker_authkey", "wrong")
+    with pytest.raises(WorkerUnavailable):
+        WorkerClient(address).check(order_log(), [], Profiler())
+
+
+def test_shared_directory_is_refused(tmp_path):
+    tmp_path.chmod(0o777)
+    with pytest.raises(PermissionError):
+        Worker(tmp_path / "socket", max_jobs=1).serve_forever()